@@ -15,6 +15,7 @@ add_mock_package = _package_manager_singleton.add_mock_package
 list_mock_packages = _package_manager_singleton.list_mock_packages
 remove_mock_package = _package_manager_singleton.remove_mock_package
 uninstall = _package_manager_singleton.uninstall
+clear_index_cache = _package_manager_singleton.clear_index_cache
 
 __all__ = [
     "install",
@@ -25,5 +26,6 @@ __all__ = [
     "remove_mock_package",
     "uninstall",
     "set_index_urls",
+    "clear_index_cache",
     "__version__",
 ]
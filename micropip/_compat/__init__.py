@@ -1,4 +1,5 @@
 import sys
+from types import MappingProxyType
 
 from .compatibility_layer import CompatibilityLayer
 
@@ -16,9 +17,11 @@ else:
     compatibility_layer = CompatibilityNotInPyodide
 
 
-REPODATA_INFO = compatibility_layer.repodata_info()
+# The lock file data is shared by every PackageManager, which keep their own
+# changes in an overlay. Expose it read-only so that it cannot be changed by accident.
+REPODATA_INFO = MappingProxyType(compatibility_layer.repodata_info())
 
-REPODATA_PACKAGES = compatibility_layer.repodata_packages()
+REPODATA_PACKAGES = MappingProxyType(compatibility_layer.repodata_packages())
 
 fetch_bytes = compatibility_layer.fetch_bytes
 
@@ -1,3 +1,4 @@
+import asyncio
 import re
 from pathlib import Path
 from typing import IO, TYPE_CHECKING, Any
@@ -43,11 +44,12 @@ class CompatibilityNotInPyodide(CompatibilityLayer):
         return urlopen(Request(url, **kwargs))
 
     @staticmethod
-    async def fetch_bytes(url: str, kwargs: dict[str, Any]) -> bytes:
-        return CompatibilityNotInPyodide._fetch(url, kwargs=kwargs).read()
+    def _fetch_bytes_sync(url: str, kwargs: dict[str, Any]) -> bytes:
+        with CompatibilityNotInPyodide._fetch(url, kwargs=kwargs) as response:
+            return response.read()
 
     @staticmethod
-    async def fetch_string_and_headers(
+    def _fetch_string_and_headers_sync(
         url: str, kwargs: dict[str, Any]
     ) -> tuple[str, dict[str, str]]:
         try:
@@ -55,8 +57,28 @@ class CompatibilityNotInPyodide(CompatibilityLayer):
         except HTTPError as e:
             raise CompatibilityNotInPyodide.HttpStatusError(e.code, str(e)) from e
 
-        headers = {k.lower(): v for k, v in response.headers.items()}
-        return response.read().decode(), headers
+        with response:
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            return response.read().decode(), headers
+
+    # urllib is blocking, so requests are run in worker threads. Otherwise, every
+    # fetch would stall the event loop and concurrent index queries and wheel
+    # downloads would be serialized. (In the browser, fetch() already reuses
+    # HTTP/2 connections, so nothing like this is needed in Pyodide.)
+
+    @staticmethod
+    async def fetch_bytes(url: str, kwargs: dict[str, Any]) -> bytes:
+        return await asyncio.to_thread(
+            CompatibilityNotInPyodide._fetch_bytes_sync, url, kwargs
+        )
+
+    @staticmethod
+    async def fetch_string_and_headers(
+        url: str, kwargs: dict[str, Any]
+    ) -> tuple[str, dict[str, str]]:
+        return await asyncio.to_thread(
+            CompatibilityNotInPyodide._fetch_string_and_headers_sync, url, kwargs
+        )
 
     @staticmethod
     def get_dynlibs(archive: IO[bytes], suffix: str, target_dir: Path) -> list[str]:
@@ -1,8 +1,11 @@
 import functools
 import json
+import os
+from collections.abc import Mapping
 from importlib.metadata import Distribution
 from pathlib import Path
 from sysconfig import get_config_var, get_platform
+from typing import Any
 
 from packaging.requirements import Requirement
 from packaging.tags import Tag
@@ -13,6 +16,41 @@ from packaging.version import InvalidVersion, Version
 
 from ._compat import REPODATA_PACKAGES
 
+# orjson is used if it is available, as it is much faster than the standard
+# library on large documents: project pages of popular packages list thousands
+# of files, and lockfiles list every installed package.
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def to_list(value: str | list[str]) -> list[str]:
+    """
+    Wrap a single string in a list. Lists are returned as is.
+    """
+    return [value] if isinstance(value, str) else value
+
+
+def json_loads(data: str | bytes) -> Any:
+    """
+    Parse a JSON document, with orjson if it is available.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def json_dumps(data: Any) -> str:
+    """
+    Serialize data to a compact JSON string, with orjson if it is available.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    return json.dumps(data, separators=(",", ":"))
+
 
 def get_dist_info(dist: Distribution) -> Path:
     """
@@ -43,15 +81,17 @@ def get_files_in_distribution(dist: Distribution) -> set[Path]:
     A list of files in the distribution.
     """
 
-    root = get_root(dist)
     dist_info = get_dist_info(dist)
+    # Resolve the root once and normalize the paths of the files lexically:
+    # resolving every file would stat each component of its path.
+    root = os.fspath(dist_info.parent.resolve())
 
     files_to_remove = set()
     pkg_files = dist.files or []
     metadata_files = dist_info.glob("*")
 
     for file in pkg_files:
-        abspath = (root / file).resolve()
+        abspath = Path(os.path.normpath(os.path.join(root, file)))
         files_to_remove.add(abspath)
 
     # Also add all files in the .dist-info directory.
@@ -73,22 +113,53 @@ def sys_tags() -> tuple[Tag, ...]:
     return tuple(new_tags)
 
 
-@functools.cache
+# The same filename is parsed several times: to get its version, to check its
+# compatibility and to build its WheelInfo, and again for every lookup of the
+# project. The result is immutable, so it can be shared.
+@functools.lru_cache(maxsize=4096)
 def parse_wheel_filename(
     filename: str,
 ) -> tuple[str, Version, BuildTag, frozenset[Tag]]:
     return parse_wheel_filename_orig(filename)
 
 
+# All the files of a release share the same version string, so the parsed
+# Version is shared too instead of being built once per file.
+@functools.lru_cache(maxsize=4096)
+def _parse_version_string(version: str) -> Version:
+    return Version(version)
+
+
 # TODO: Move these helper functions back to WheelInfo
 def parse_version(filename: str) -> Version:
-    return parse_wheel_filename(filename)[1]
+    """
+    Get the version of a wheel from its filename.
+
+    Only the version field is parsed: the files of a project are grouped by
+    version, but the tags are only needed for the versions that end up being
+    considered, and those are parsed in full by parse_wheel_filename().
+    """
+    # {distribution}-{version}(-{build tag})?-{python tag}-{abi tag}-{platform tag}.whl
+    parts = filename.split("-")
+    if len(parts) not in (5, 6):
+        raise InvalidWheelFilename(f"Invalid wheel filename: {filename!r}")
+
+    return _parse_version_string(parts[1])
 
 
 def parse_tags(filename: str) -> frozenset[Tag]:
     return parse_wheel_filename(filename)[3]
 
 
+@functools.cache
+def _sys_tag_ranks() -> dict[Tag, int]:
+    # Only the first (best) index of a tag counts.
+    ranks: dict[Tag, int] = {}
+    for index, tag in enumerate(sys_tags()):
+        ranks.setdefault(tag, index)
+    return ranks
+
+
 def best_compatible_tag_index(tags: frozenset[Tag]) -> int | None:
     """Get the index of the first tag in ``packaging.tags.sys_tags()`` that a wheel has.
 
@@ -105,10 +176,8 @@ def best_compatible_tag_index(tags: frozenset[Tag]) -> int | None:
     -------
     The index, or ``None`` if this wheel has no compatible tags.
     """
-    for index, tag in enumerate(sys_tags()):
-        if tag in tags:
-            return index
-    return None
+    ranks = _sys_tag_ranks()
+    return min((ranks[tag] for tag in tags if tag in ranks), default=None)
 
 
 def is_package_compatible(filename: str) -> bool:
@@ -176,15 +245,11 @@ def check_compatible(filename: str) -> None:
             f"Pyodide was built with Emscripten v{pyodide_emscripten_version}"
         )
 
-    abi_incompatible = True
     from sys import version_info
 
     version = f"{version_info.major}{version_info.minor}"
-    abis = ["abi3", f"cp{version}"]
-    for tag in tags:
-        if tag.abi in abis:
-            abi_incompatible = False
-        break
+    abis = {"abi3", f"cp{version}"}
+    abi_incompatible = not any(tag.abi in abis for tag in tags)
     if abi_incompatible:
         abis_string = ",".join({tag.abi for tag in tags})
         raise ValueError(
@@ -195,7 +260,10 @@ def check_compatible(filename: str) -> None:
 
 
 def fix_package_dependencies(
-    package_name: str, *, extras: list[str | None] | None = None
+    package_name: str,
+    *,
+    extras: list[str | None] | None = None,
+    repodata_packages: Mapping[str, Any] = REPODATA_PACKAGES,
 ) -> None:
     """Check and fix the list of dependencies for this package
 
@@ -213,8 +281,11 @@ def fix_package_dependencies(
     extras (list):
         List of extras for this package.
 
+    repodata_packages (Mapping):
+        Packages of the lock file, which are never checked.
+
     """
-    if package_name in REPODATA_PACKAGES:
+    if package_name in repodata_packages:
         # don't check things that are in original repository
         return
 
@@ -259,7 +330,11 @@ def fix_package_dependencies(
             needs_requirement = True
 
         if needs_requirement:
-            fix_package_dependencies(req_name, extras=list(req_extras))
+            fix_package_dependencies(
+                req_name,
+                extras=list(req_extras),
+                repodata_packages=repodata_packages,
+            )
 
             if req_name not in depends:
                 depends.append(req_name)
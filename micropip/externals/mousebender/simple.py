@@ -109,6 +109,19 @@ class ProjectDetails_1_1(TypedDict):
 ProjectDetails: TypeAlias = Union[ProjectDetails_1_0, ProjectDetails_1_1]
 
 
+class ProjectIndexProject_1_0(TypedDict):
+    """A :class:`~typing.TypedDict` for the ``projects`` key of :class:`ProjectIndex_1_0`."""
+
+    name: str
+
+
+class ProjectIndex_1_0(TypedDict):
+    """A :class:`~typing.TypedDict` for a project index response (:pep:`691`)."""
+
+    meta: _Meta_1_0
+    projects: List[ProjectIndexProject_1_0]
+
+
 def _check_version(tag: str, attrs: Dict[str, Optional[str]]) -> None:
     if (
         tag == "meta"
@@ -124,6 +137,41 @@ def _check_version(tag: str, attrs: Dict[str, Optional[str]]) -> None:
             warnings.warn(APIVersionWarning(version), stacklevel=7)
 
 
+class _SimpleIndexHTMLParser(html.parser.HTMLParser):
+    # PEP 503:
+    # Within a repository, the root URL (/) MUST be a valid HTML5 page with a
+    # single anchor element per project in the repository.
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self._in_anchor = False
+        super().__init__()
+
+    def handle_starttag(
+        self, tag: str, attrs_list: list[tuple[str, Optional[str]]]
+    ) -> None:
+        attrs = dict(attrs_list)
+        _check_version(tag, attrs)
+        if tag == "a":
+            self._in_anchor = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a":
+            self._in_anchor = False
+
+    def handle_data(self, data: str) -> None:
+        if self._in_anchor:
+            self.names.append(data.strip())
+
+
+def from_project_index_html(html: str) -> ProjectIndex_1_0:
+    """Convert the HTML response of a repository index page to a :pep:`691` response."""
+    parser = _SimpleIndexHTMLParser()
+    parser.feed(html)
+    project_index = (ProjectIndexProject_1_0(name=name) for name in parser.names)
+    return {"meta": {"api-version": "1.0"}, "projects": list(project_index)}
+
+
 class _ArchiveLinkHTMLParser(html.parser.HTMLParser):
     def __init__(self) -> None:
         self.archive_links: List[Dict[str, Any]] = []
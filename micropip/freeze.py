@@ -1,8 +1,8 @@
 import importlib.metadata
 import itertools
 import json
-from collections.abc import Iterator
-from copy import deepcopy
+from collections.abc import Iterator, Mapping
+from operator import itemgetter
 from typing import Any
 
 from packaging.utils import canonicalize_name
@@ -11,30 +11,34 @@ from ._utils import fix_package_dependencies
 
 
 def freeze_lockfile(
-    lockfile_packages: dict[str, dict[str, Any]], lockfile_info: dict[str, str]
-) -> str:
-    return json.dumps(freeze_data(lockfile_packages, lockfile_info))
-
-
-def freeze_data(
-    lockfile_packages: dict[str, dict[str, Any]], lockfile_info: dict[str, str]
+    lockfile_packages: Mapping[str, dict[str, Any]], lockfile_info: Mapping[str, str]
 ) -> dict[str, Any]:
-    pyodide_packages = deepcopy(lockfile_packages)
-    pip_packages = load_pip_packages()
-    package_items = itertools.chain(pyodide_packages.items(), pip_packages)
-
-    # Sort
-    packages = dict(sorted(package_items))
+    # The entries of the lockfile are shared rather than copied: the result is
+    # only meant to be serialized, and must not be modified in place.
+    pip_packages = load_pip_packages(lockfile_packages)
+    package_items = itertools.chain(lockfile_packages.items(), pip_packages)
+
+    # Sort by name only: the entries themselves are not comparable. Sorting is
+    # stable, so a package installed with micropip replaces the lock file entry.
+    packages = dict(sorted(package_items, key=itemgetter(0)))
     return {
-        "info": lockfile_info,
+        "info": dict(lockfile_info),
         "packages": packages,
     }
 
 
-def load_pip_packages() -> Iterator[tuple[str, dict[str, Any]]]:
+def load_pip_packages(
+    lockfile_packages: Mapping[str, dict[str, Any]],
+) -> Iterator[tuple[str, dict[str, Any]]]:
     return map(
         package_item,
-        filter(is_valid, map(load_pip_package, importlib.metadata.distributions())),
+        filter(
+            is_valid,
+            (
+                load_pip_package(dist, lockfile_packages)
+                for dist in importlib.metadata.distributions()
+            ),
+        ),
     )
 
 
@@ -46,7 +50,10 @@ def is_valid(entry: dict[str, Any]) -> bool:
     return entry["file_name"] is not None
 
 
-def load_pip_package(dist: importlib.metadata.Distribution) -> dict[str, Any]:
+def load_pip_package(
+    dist: importlib.metadata.Distribution,
+    lockfile_packages: Mapping[str, dict[str, Any]],
+) -> dict[str, Any]:
     name = dist.name
     version = dist.version
     url = dist.read_text("PYODIDE_URL")
@@ -54,7 +61,7 @@ def load_pip_package(dist: importlib.metadata.Distribution) -> dict[str, Any]:
     imports = (dist.read_text("top_level.txt") or "").split()
     requires = dist.read_text("PYODIDE_REQUIRES")
     if not requires:
-        fix_package_dependencies(name)
+        fix_package_dependencies(name, repodata_packages=lockfile_packages)
         requires = dist.read_text("PYODIDE_REQUIRES")
     depends = json.loads(requires or "[]")
 
@@ -1,32 +1,102 @@
 import asyncio
+import functools
 import importlib
-from collections.abc import Coroutine
+import importlib.metadata
+from collections.abc import Awaitable, Mapping
+from itertools import chain
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlparse
 
 from packaging.markers import default_environment
+from packaging.requirements import Requirement
 
-from ._compat import loadPackage, to_js
+from ._compat import REPODATA_PACKAGES, loadPackage, to_js
+from ._utils import to_list
 from .constants import FAQ_URLS
 from .logging import setup_logging
 from .transaction import Transaction
+from .wheelinfo import WheelInfo
+
+
+@functools.cache
+def _default_environment() -> dict[str, str]:
+    # The marker environment does not change during the lifetime of the interpreter,
+    # and computing it calls into `platform`, which is relatively slow.
+    return default_environment()  # type: ignore[return-value]
+
+
+def _parse_requirements(requirements: list[str]) -> list[str | Requirement]:
+    """
+    Parse every requirement that is not a wheel URL, so that each one is only
+    parsed once per install, no matter how many times it is inspected.
+    """
+    return [
+        req if urlparse(req).path.endswith(".whl") else Requirement(req)
+        for req in requirements
+    ]
+
+
+def _satisfied_requirements(
+    requirements: list[str | Requirement],
+) -> list[tuple[Requirement, str]] | None:
+    """
+    Get the installed version of every requirement, if all of them are plain
+    requirements that are already satisfied. Otherwise, return None.
+
+    In that case there is nothing to resolve, so install() can skip the
+    Transaction entirely.
+    """
+    satisfied = []
+    for req in requirements:
+        if isinstance(req, str):
+            # A wheel URL
+            return None
+
+        # Extras and markers are evaluated by the Transaction
+        if req.extras or req.marker or req.url:
+            return None
+
+        try:
+            version = importlib.metadata.version(req.name)
+        except importlib.metadata.PackageNotFoundError:
+            return None
+
+        if not req.specifier.contains(version, prereleases=True):
+            return None
+
+        satisfied.append((req, version))
+
+    return satisfied
 
 
 async def install(
     requirements: str | list[str],
-    index_urls: list[str] | str,
+    index_urls: list[str] | tuple[str, ...] | str,
     keep_going: bool = False,
     deps: bool = True,
     credentials: str | None = None,
     pre: bool = False,
     *,
     verbose: bool | int | None = None,
+    invalidate_caches: bool = True,
+    repodata_packages: Mapping[str, dict[str, Any]] = REPODATA_PACKAGES,
 ) -> None:
+    requirements = [req for req in to_list(requirements) if req.strip()]
+    if not requirements:
+        return
+
     with setup_logging().ctx_level(verbose) as logger:
 
-        ctx = default_environment()
-        if isinstance(requirements, str):
-            requirements = [requirements]
+        parsed_requirements = _parse_requirements(requirements)
+        satisfied = _satisfied_requirements(parsed_requirements)
+        if satisfied is not None:
+            for req, version in satisfied:
+                logger.info("Requirement already satisfied: %s (%s)", req, version)
+            return
+
+        # Transaction updates the context while evaluating markers, so give it a copy.
+        ctx = dict(_default_environment())
 
         fetch_kwargs = {}
 
@@ -41,7 +111,7 @@ async def install(
         wheel_base = Path(getsitepackages()[0])
 
         transaction = Transaction(
-            ctx=ctx,  # type: ignore[arg-type]
+            ctx=ctx,
             ctx_extras=[],
             keep_going=keep_going,
             deps=deps,
@@ -49,52 +119,81 @@ async def install(
             fetch_kwargs=fetch_kwargs,
             verbose=verbose,
             index_urls=index_urls,
+            repodata_packages=repodata_packages,
         )
-        await transaction.gather_requirements(requirements)
+        await transaction.gather_requirements(parsed_requirements)
 
         if transaction.failed:
-            failed_requirements = ", ".join([f"'{req}'" for req in transaction.failed])
+            failed_requirements = ", ".join(f"'{req}'" for req in transaction.failed)
             raise ValueError(
                 f"Can't find a pure Python 3 wheel for: {failed_requirements}\n"
                 f"See: {FAQ_URLS['cant_find_wheel']}\n"
             )
 
-        package_names = [pkg.name for pkg in transaction.pyodide_packages] + [
-            pkg.name for pkg in transaction.wheels
-        ]
+        pyodide_package_names = [pkg.name for pkg in transaction.pyodide_packages]
 
         logger.debug(
             "Installing packages %r and wheels %r ",
             transaction.pyodide_packages,
             [w.filename for w in transaction.wheels],
         )
-        if package_names:
+        if pyodide_package_names or transaction.wheels:
+            package_names = chain(
+                pyodide_package_names, (wheel.name for wheel in transaction.wheels)
+            )
             logger.info("Installing collected packages: %s", ", ".join(package_names))
 
-        wheel_promises: list[Coroutine[Any, Any, None] | asyncio.Task[Any]] = []
+        wheel_promises: list[Awaitable[Any]] = []
         # Install built-in packages
-        pyodide_packages = transaction.pyodide_packages
-        if len(pyodide_packages):
+        if pyodide_package_names:
             # Note: branch never happens in out-of-browser testing because in
             # that case REPODATA_PACKAGES is empty.
+            # asyncio.gather() wraps the awaitable in a task itself.
+            # The names are plain strings, so no PyProxy is ever needed.
             wheel_promises.append(
-                asyncio.ensure_future(
-                    loadPackage(to_js([name for [name, _, _] in pyodide_packages]))
-                )
+                loadPackage(to_js(pyodide_package_names, create_pyproxies=False))
             )
 
         # Now install PyPI packages
         # detect whether the wheel metadata is from PyPI or from custom location
         # wheel metadata from PyPI has SHA256 checksum digest.
-        wheel_promises.extend(wheel.install(wheel_base) for wheel in transaction.wheels)
+        wheel_promises.append(_install_wheels(transaction.install_layers(), wheel_base))
 
         await asyncio.gather(*wheel_promises)
 
-        packages = [
-            f"{pkg.name}-{pkg.version}" for pkg in transaction.pyodide_packages
-        ] + [f"{pkg.name}-{pkg.version}" for pkg in transaction.wheels]
-
-        if packages:
+        if transaction.pyodide_packages or transaction.wheels:
+            packages = chain(
+                (f"{pkg.name}-{pkg.version}" for pkg in transaction.pyodide_packages),
+                (f"{wheel.name}-{wheel.version}" for wheel in transaction.wheels),
+            )
             logger.info("Successfully installed %s", ", ".join(packages))
 
-        importlib.invalidate_caches()
+        # Nothing was written to site-packages if all requirements were satisfied
+        if invalidate_caches and (transaction.pyodide_packages or transaction.wheels):
+            importlib.invalidate_caches()
+
+
+async def _install_wheels(layers: list[list[WheelInfo]], target: Path) -> None:
+    """
+    Install the wheels layer by layer, so that the dependencies of a wheel
+    (e.g. the shared libraries it links against) are in place before it is
+    installed. The wheels within a layer are installed concurrently.
+    """
+    for layer in layers:
+        # Let every install in the layer finish before reporting a failure, so
+        # that no wheel is left half-extracted in the background.
+        results = await asyncio.gather(
+            *(wheel.install(target) for wheel in layer), return_exceptions=True
+        )
+        errors = [
+            (wheel, result)
+            for wheel, result in zip(layer, results, strict=True)
+            if isinstance(result, BaseException)
+        ]
+        if errors:
+            error = errors[0][1]
+            for wheel, other_error in errors[1:]:
+                error.add_note(
+                    f"Installing {wheel.filename} also failed: {other_error!r}"
+                )
+            raise error
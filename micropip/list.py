@@ -1,36 +1,77 @@
 import importlib.metadata
+import os
+import sys
+from collections.abc import Iterable, Mapping
 from typing import Any
 
-from ._compat import loadedPackages
+from packaging.utils import canonicalize_name
+
 from .package import PackageDict, PackageMetadata
 
 
-def list_installed_packages(
-    lockfile_packages: dict[str, dict[str, Any]]
-) -> PackageDict:
-    # Add packages that are loaded through pyodide.loadPackage
-    packages = PackageDict()
+def list_installed_distributions() -> list[tuple[str, str, str]]:
+    """
+    Get the name, version and source of every distribution installed
+    by micropip or by ``pyodide.loadPackage``.
+    """
+    distributions = []
     for dist in importlib.metadata.distributions():
-        name = dist.name
-        version = dist.version
         source = dist.read_text("PYODIDE_SOURCE")
         if source is None:
             # source is None if PYODIDE_SOURCE does not exist. In this case the
             # wheel was installed manually, not via `pyodide.loadPackage` or
             # `micropip`.
             continue
-        packages[name] = PackageMetadata(
+
+        # dist.name and dist.version would each read and parse the metadata file
+        metadata = dist.metadata
+        distributions.append((metadata["Name"], metadata["Version"], source))
+
+    return distributions
+
+
+def sys_path_mtimes() -> tuple[tuple[str, int], ...]:
+    """
+    Get the modification time of every ``sys.path`` entry.
+
+    Installing or removing a distribution adds or removes its ``.dist-info``
+    directory, which changes the modification time of the directory it is in.
+    """
+    mtimes = []
+    for path in sys.path:
+        try:
+            mtimes.append((path, os.stat(path or ".").st_mtime_ns))
+        except OSError:
+            mtimes.append((path, -1))
+
+    return tuple(mtimes)
+
+
+def list_installed_packages(
+    lockfile_packages: Mapping[str, dict[str, Any]],
+    distributions: Iterable[tuple[str, str, str]],
+    loaded_packages: Mapping[str, str],
+) -> PackageDict:
+    # Fill a plain dict keyed by normalized name, so that the lookups below do
+    # not normalize the names again through PackageDict.
+    packages: dict[str, PackageMetadata] = {}
+    for name, version, source in distributions:
+        packages[canonicalize_name(name)] = PackageMetadata(
             name=name,
             version=version,
             source=source,
         )
 
-    for name, pkg_source in loadedPackages.to_py().items():
-        if name in packages:
+    # Add packages that are loaded through pyodide.loadPackage
+    for name, pkg_source in loaded_packages.items():
+        normalized_name = canonicalize_name(name)
+        if normalized_name in packages:
             continue
 
-        if name in lockfile_packages:
-            version = lockfile_packages[name]["version"]
+        # lockfile_packages may be a ChainMap, so look the name up only once
+        lockfile_package = lockfile_packages.get(name)
+        if lockfile_package is not None:
+            version = lockfile_package["version"]
             source_ = "pyodide"
             if pkg_source != "default channel":
                 # Pyodide package loaded from a custom URL
@@ -39,5 +80,8 @@ def list_installed_packages(
             # TODO: calculate version from wheel metadata
             version = "unknown"
             source_ = pkg_source
-        packages[name] = PackageMetadata(name=name, version=version, source=source_)
-    return packages
+        packages[normalized_name] = PackageMetadata(
+            name=name, version=version, source=source_
+        )
+
+    return PackageDict(packages)
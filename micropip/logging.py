@@ -5,6 +5,7 @@ from contextlib import contextmanager
 from typing import Any
 
 _logger: logging.Logger | None = None
+_logger_wrapper: "LoggerWrapper | None" = None
 _indentation: int = 0
 
 
@@ -73,7 +74,7 @@ class IndentingFormatter(logging.Formatter):
 
 
 def _set_formatter_once() -> None:
-    global _logger
+    global _logger, _logger_wrapper
 
     if _logger is not None:
         return
@@ -86,6 +87,8 @@ def _set_formatter_once() -> None:
 
     _logger.addHandler(ch)
 
+    _logger_wrapper = LoggerWrapper(_logger)
+
 
 class LoggerWrapper:
 
@@ -127,8 +130,8 @@ class LoggerWrapper:
 
 def setup_logging() -> LoggerWrapper:
     _set_formatter_once()
-    assert _logger
-    return LoggerWrapper(_logger)
+    assert _logger_wrapper
+    return _logger_wrapper
 
 
 # TODO: expose this somehow
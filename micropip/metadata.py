@@ -127,4 +127,7 @@ class Metadata:
                 deps.extend(self.deps[safe_extra(ext)])
             except KeyError:
                 raise KeyError(f"Unknown extra {ext!r}") from None
-        return deps
+
+        # A requirement can belong to several of the requested extras,
+        # e.g. `extra == "a" or extra == "b"`: it only needs to be resolved once.
+        return list(dict.fromkeys(deps))
@@ -1,31 +1,78 @@
+import asyncio
 import json
 import logging
 import string
 import sys
-from collections import defaultdict
+import time
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable, Generator
 from dataclasses import dataclass
 from functools import partial
 from typing import Any
 from urllib.parse import urlparse, urlunparse
 
-from packaging.utils import InvalidWheelFilename
+from packaging.utils import InvalidWheelFilename, canonicalize_name
 from packaging.version import InvalidVersion, Version
 
 from ._compat import HttpStatusError, fetch_string_and_headers
-from ._utils import is_package_compatible, parse_version
-from .externals.mousebender.simple import from_project_details_html
+from ._utils import is_package_compatible, json_loads, parse_version
+from .externals.mousebender.simple import (
+    from_project_details_html,
+    from_project_index_html,
+)
 from .types import DistributionMetadata
 from .wheelinfo import WheelInfo
 
 PYPI = "PYPI"
 PYPI_URL = "https://pypi.org/simple"
-DEFAULT_INDEX_URLS = [PYPI_URL]
+DEFAULT_INDEX_URLS = (PYPI_URL,)
 
 _formatter = string.Formatter()
 
 logger = logging.getLogger("micropip")
 
+# Number of seconds a prefetched project list is used for.
+INDEX_PROJECTS_TTL = 600.0
+
+# Canonical names of the projects hosted on each index, keyed by index URL
+# (without trailing slash), along with the time.monotonic() deadline until which
+# they are used. This is filled by prefetch_project_names(). Project lists are
+# only hints: they never change which index a package is taken from.
+_index_projects: dict[str, tuple[float, frozenset[str]]] = {}
+
+# Number of seconds during which lookups on an index that could not be reached
+# (a network error, not an HTTP error status) fail right away, so that retrying
+# an install during an outage does not wait for the same index to fail again.
+# An error status only concerns the page that returned it, so it is not cached.
+UNREACHABLE_INDEX_TTL = 30.0
+
+# time.monotonic() deadline until which lookups on each index URL fail fast.
+_unreachable_indexes: dict[str, float] = {}
+
+# Maximum total size, in characters, of the project pages kept in
+# _index_responses. Pages of large projects can weigh several megabytes and the
+# browser's HTTP cache already stores them, so pages are not kept by default.
+INDEX_RESPONSE_CACHE_SIZE = 0
+
+# Maximum number of seconds a project page is reused for, even if its
+# Cache-Control header allows more. Pages without a max-age are never reused.
+INDEX_RESPONSE_TTL = 60.0
+
+# Project pages fetched from the indexes, keyed by URL and fetch arguments, along
+# with the time.monotonic() deadline until which they are reused, from least to
+# most recently used. ProjectInfo objects hold single-use generators, so the raw
+# responses are kept instead.
+_index_responses: OrderedDict[tuple[str, str], tuple[float, str, dict[str, str]]] = (
+    OrderedDict()
+)
+
+# Project pages being fetched, keyed like _index_responses. Requirements are
+# resolved concurrently, so different parts of the dependency tree can ask for
+# the same project before any of them has received it.
+_index_page_requests: dict[
+    tuple[str, str], "asyncio.Future[tuple[str, dict[str, str]]]"
+] = {}
+
 
 @dataclass
 class ProjectInfo:
@@ -50,7 +97,7 @@ class ProjectInfo:
         https://warehouse.pypa.io/api-reference/json.html
         """
 
-        data_dict = json.loads(data) if isinstance(data, str | bytes) else data
+        data_dict = json_loads(data) if isinstance(data, str | bytes) else data
 
         name: str = data_dict.get("info", {}).get("name", "UNKNOWN")
         releases_raw: dict[str, list[Any]] = data_dict["releases"]
@@ -66,7 +113,12 @@ class ProjectInfo:
             if not fileinfo:
                 continue
 
-            releases[version] = fileinfo
+            # parsing a wheel filename is expensive, so we do a quick check first
+            releases[version] = [
+                file
+                for file in fileinfo
+                if _fast_check_incompatibility(file["filename"])
+            ]
 
         return ProjectInfo._compatible_only(name, releases)
 
@@ -78,7 +130,7 @@ class ProjectInfo:
         https://peps.python.org/pep-0691/
         """
 
-        data_dict = json.loads(data) if isinstance(data, str | bytes) else data
+        data_dict = json_loads(data) if isinstance(data, str | bytes) else data
         name, releases = ProjectInfo._parse_pep691_response(
             data_dict, index_base_url=""
         )
@@ -154,23 +206,36 @@ class ProjectInfo:
             hashes = file["digests"] if "digests" in file else file["hashes"]
             sha256 = hashes.get("sha256")
 
-            # Check if the metadata file is available (PEP 658 / PEP-714)
-            core_metadata: DistributionMetadata = file.get("core-metadata") or file.get(
-                "data-dist-info-metadata"
+            # Check if the metadata file is available (PEP 658 / PEP-714).
+            # Indexes that predate PEP 714 only set the "dist-info-metadata" key,
+            # and a value of False means that the metadata file is not available.
+            core_metadata: DistributionMetadata = (
+                file["core-metadata"]
+                if "core-metadata" in file
+                else file.get("dist-info-metadata")
             )
+            if core_metadata is False:
+                core_metadata = None
 
             # Size of the file in bytes, if available (PEP 700)
             # This key is not available in the Simple API HTML response, so this field may be None
             size = file.get("size")
-            yield WheelInfo.from_package_index(
-                name=name,
-                filename=filename,
-                url=file["url"],
-                version=version,
-                sha256=sha256,
-                size=size,
-                core_metadata=core_metadata,
-            )
+            try:
+                wheel = WheelInfo.from_package_index(
+                    name=name,
+                    filename=filename,
+                    url=file["url"],
+                    version=version,
+                    sha256=sha256,
+                    size=size,
+                    core_metadata=core_metadata,
+                )
+            except InvalidWheelFilename:
+                # Only the version field was checked when grouping the files,
+                # so a malformed filename is only noticed here.
+                continue
+
+            yield wheel
 
     @classmethod
     def _compatible_only(
@@ -181,15 +246,13 @@ class ProjectInfo:
         Checking compatibility takes a bit of time, so we use a generator to avoid doing it if not needed.
         """
 
-        releases_compatible = {
-            version: cls._compatible_wheels(files, version, name=name)
-            for version, files in releases.items()
-        }
-
         # Unfortunately, the JSON API seems to compare versions as strings...
         # For example, pytest 3.10.0 is considered newer than 3.2.0.
         # So we need to sort the releases by version again here.
-        releases_compatible = dict(sorted(releases_compatible.items()))
+        releases_compatible = {
+            version: cls._compatible_wheels(releases[version], version, name=name)
+            for version in sorted(releases)
+        }
 
         return cls(
             name=name,
@@ -221,7 +284,9 @@ def _fast_check_incompatibility(filename: str) -> bool:
     if not filename.endswith(".whl"):
         return False
 
-    if filename.endswith("wasm32.whl") and sys.platform == "emscripten":
+    # Not conditional on sys.platform: whether a wasm32 wheel actually matches
+    # the platform is left to the full tag check.
+    if filename.endswith("wasm32.whl"):
         return True
 
     if sys.platform not in filename and not filename.endswith("-none-any.whl"):
@@ -261,9 +326,191 @@ def _select_parser(
             raise ValueError(f"Unsupported content type: {content_type}")
 
 
+def _prepare_fetch_kwargs(fetch_kwargs: dict[str, Any] | None) -> dict[str, Any]:
+    _fetch_kwargs = fetch_kwargs.copy() if fetch_kwargs else {}
+
+    if "headers" not in _fetch_kwargs:
+        _fetch_kwargs["headers"] = {}
+
+    # If not specified, prefer Simple JSON API over Simple HTML API or JSON API
+    _fetch_kwargs["headers"].setdefault(
+        "accept", "application/vnd.pypi.simple.v1+json, */*;q=0.01"
+    )
+
+    return _fetch_kwargs
+
+
+async def prefetch_project_names(
+    index_url: str,
+    fetch_kwargs: dict[str, Any] | None = None,
+) -> None:
+    """
+    Fetch the list of projects hosted on a Simple API index and cache it.
+
+    This is only an optimization, so any error is ignored. PyPI is skipped
+    because its project list is far too large to download.
+
+    Parameters
+    ----------
+    index_url
+        URL of the root of the Simple API index.
+    fetch_kwargs
+        Keyword arguments to pass to the fetch function.
+    """
+    index_url = index_url.rstrip("/")
+    if index_url in (PYPI, PYPI_URL) or _contain_placeholder(index_url):
+        return
+
+    url = index_url + "/"
+    try:
+        content, headers = await fetch_string_and_headers(
+            url, _prepare_fetch_kwargs(fetch_kwargs)
+        )
+
+        content_type = headers.get("content-type", "").lower()
+        if content_type == "application/vnd.pypi.simple.v1+json":
+            projects = json_loads(content)["projects"]
+        elif content_type.startswith(("text/html", "application/vnd.pypi.simple")):
+            projects = from_project_index_html(content)["projects"]
+        else:
+            logger.debug("Unsupported content type for %r: %s", url, content_type)
+            return
+    except Exception as e:
+        logger.debug("Failed to prefetch the project list of %r: %r", url, e)
+        return
+
+    _index_projects[index_url] = (
+        time.monotonic() + INDEX_PROJECTS_TTL,
+        frozenset(canonicalize_name(project["name"]) for project in projects),
+    )
+
+
+def _mark_unreachable(index_url: str) -> None:
+    _unreachable_indexes[index_url] = time.monotonic() + UNREACHABLE_INDEX_TTL
+
+
+def _recently_failed(index_url: str) -> bool:
+    return _unreachable_indexes.get(index_url, 0.0) > time.monotonic()
+
+
+def _retry_after(index_url: str) -> float:
+    return max(_unreachable_indexes.get(index_url, 0.0) - time.monotonic(), 0.0)
+
+
+async def _fetch_index_page(
+    url: str, fetch_kwargs: dict[str, Any]
+) -> tuple[str, dict[str, str]]:
+    """
+    Fetch a project page from an index, reusing a recent response if there is one,
+    or the request in flight if the page is already being fetched.
+    """
+    # Shielded, so that a cancelled caller does not cancel the request for the others.
+    return await asyncio.shield(_request_index_page(url, fetch_kwargs))
+
+
+def _request_index_page(
+    url: str, fetch_kwargs: dict[str, Any]
+) -> "asyncio.Future[tuple[str, dict[str, str]]]":
+    """
+    Start fetching a project page, unless it is cached or already being fetched.
+    """
+    key = (url, json.dumps(fetch_kwargs, sort_keys=True, default=str))
+    cached = _index_responses.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        logger.debug("Using cached response for %r", url)
+        _index_responses.move_to_end(key)
+        response: asyncio.Future[tuple[str, dict[str, str]]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        response.set_result((cached[1], cached[2]))
+        return response
+
+    request = _index_page_requests.get(key)
+    # A request left in flight by an event loop that has since been closed
+    # will never complete.
+    if request is None or request.get_loop() is not asyncio.get_running_loop():
+        request = asyncio.ensure_future(fetch_string_and_headers(url, fetch_kwargs))
+        request.add_done_callback(partial(_index_page_fetched, key))
+        _index_page_requests[key] = request
+
+    return request
+
+
+def _index_page_fetched(
+    key: tuple[str, str], request: "asyncio.Future[tuple[str, dict[str, str]]]"
+) -> None:
+    _index_page_requests.pop(key, None)
+    if request.cancelled() or request.exception() is not None:
+        return
+
+    content, headers = request.result()
+    lifetime = _cache_lifetime(headers)
+    if lifetime <= 0 or len(content) > INDEX_RESPONSE_CACHE_SIZE:
+        return
+
+    # Drop the pages that expired, then the least recently used ones.
+    now = time.monotonic()
+    expired = [k for k, cached in _index_responses.items() if cached[0] <= now]
+    for expired_key in expired:
+        del _index_responses[expired_key]
+
+    _index_responses[key] = (now + lifetime, content, headers)
+    _index_responses.move_to_end(key)
+    size = sum(len(cached[1]) for cached in _index_responses.values())
+    while size > INDEX_RESPONSE_CACHE_SIZE:
+        _, (_, dropped, _) = _index_responses.popitem(last=False)
+        size -= len(dropped)
+
+
+def _cache_lifetime(headers: dict[str, str]) -> float:
+    """
+    Get the number of seconds a response may be reused for, according to its
+    Cache-Control header, capped to INDEX_RESPONSE_TTL.
+    """
+    directives = [
+        directive.strip().lower()
+        for directive in headers.get("cache-control", "").split(",")
+    ]
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+
+    for directive in directives:
+        name, _, value = directive.partition("=")
+        if name == "max-age":
+            try:
+                return min(float(value.strip('"')), INDEX_RESPONSE_TTL)
+            except ValueError:
+                return 0.0
+
+    return 0.0
+
+
+def clear_index_cache() -> None:
+    """
+    Forget the prefetched project lists, the cached project pages and the
+    indexes that failed recently.
+    """
+    _index_responses.clear()
+    _index_projects.clear()
+    _unreachable_indexes.clear()
+
+
+def _known_missing(name: str, index_url: str) -> bool:
+    entry = _index_projects.get(index_url.rstrip("/"))
+    if entry is None or entry[0] <= time.monotonic():
+        return False
+    return canonicalize_name(name) not in entry[1]
+
+
+def _project_page_url(index_url: str, name: str) -> str:
+    if _contain_placeholder(index_url):
+        return index_url.format(package_name=name)
+    return f"{index_url}/{name}/"
+
+
 async def query_package(
     name: str,
-    index_urls: list[str] | str,
+    index_urls: list[str] | tuple[str, ...] | str,
     fetch_kwargs: dict[str, Any] | None = None,
 ) -> ProjectInfo:
     """
@@ -281,38 +528,48 @@ async def query_package(
         Keyword arguments to pass to the fetch function.
     """
 
-    _fetch_kwargs = fetch_kwargs.copy() if fetch_kwargs else {}
-
-    if "headers" not in _fetch_kwargs:
-        _fetch_kwargs["headers"] = {}
-
-    # If not specified, prefer Simple JSON API over Simple HTML API or JSON API
-    _fetch_kwargs["headers"].setdefault(
-        "accept", "application/vnd.pypi.simple.v1+json, */*;q=0.01"
-    )
+    _fetch_kwargs = _prepare_fetch_kwargs(fetch_kwargs)
 
     if isinstance(index_urls, str):
-        index_urls = [index_urls]
+        index_urls = (index_urls,)
+
+    index_urls = tuple(PYPI_URL if url == PYPI else url for url in index_urls)
+
+    for position, index_url in enumerate(index_urls, start=1):
+        logger.debug("Looping through index urls: %r", index_url)
+        if _recently_failed(index_url):
+            # Do not fall back to the next index: it could serve a different
+            # project under the same name.
+            raise ValueError(
+                f"Can't fetch metadata for '{name}': index {index_url} failed "
+                f"recently, retry after {_retry_after(index_url):.0f}s. "
+                "Use `micropip.clear_index_cache()` to retry it right away."
+            )
 
-    index_urls = [PYPI_URL if url == PYPI else url for url in index_urls]
+        url = _project_page_url(index_url, name)
+        logger.debug("Fetching %r", url)
+
+        if position < len(index_urls) and _known_missing(name, index_url):
+            # The project list of this index does not have the package, so the
+            # next index will most likely be needed: start fetching its page
+            # already. Indexes are still tried in order, as the list may be out
+            # of date, so the next page is only used if this index has no page.
+            next_index_url = index_urls[position]
+            if not _recently_failed(next_index_url):
+                _request_index_page(
+                    _project_page_url(next_index_url, name), _fetch_kwargs
+                )
 
-    for url in index_urls:
-        logger.debug("Looping through index urls: %r", url)
-        if _contain_placeholder(url):
-            url = url.format(package_name=name)
-            logger.debug("Formatting url with package name : %r", url)
-        else:
-            url = f"{url}/{name}/"
-            logger.debug("Url has no placeholder, appending package name : %r", url)
         try:
-            metadata, headers = await fetch_string_and_headers(url, _fetch_kwargs)
+            metadata, headers = await _fetch_index_page(url, _fetch_kwargs)
         except HttpStatusError as e:
             if e.status_code == 404:
                 logger.debug("NotFound (404) for %r, trying next index.", url)
                 continue
-            logger.debug(
-                "Error fetching %r (%s), trying next index.", url, e.status_code
-            )
+            logger.debug("Error fetching %r (%s).", url, e.status_code)
+            raise
+        except OSError:
+            _mark_unreachable(index_url)
             raise
 
         content_type = headers.get("content-type", "").lower()
@@ -1,17 +1,30 @@
+import asyncio
 import builtins
+from collections import ChainMap
+from collections.abc import MutableMapping
 from typing import (  # noqa: UP035 List import is necessary due to the `list` method
     Any,
     List,
 )
 
-from . import _mock_package, package_index
-from ._compat import REPODATA_INFO, REPODATA_PACKAGES
+from . import package_index
+from ._compat import REPODATA_INFO, REPODATA_PACKAGES, loadedPackages
+from ._utils import json_dumps
 from .freeze import freeze_lockfile
 from .install import install
-from .list import list_installed_packages
+from .list import (
+    list_installed_distributions,
+    list_installed_packages,
+    sys_path_mtimes,
+)
 from .package import PackageDict
 from .uninstall import uninstall
 
+# _mock_package is imported when first used: it is rarely needed, and micropip
+# is imported on startup by Pyodide, where every module loaded adds to the time
+# until the interpreter is ready. (micropip.freeze must be imported eagerly, as
+# importing it later would replace the micropip.freeze() function with the module.)
+
 
 class PackageManager:
     """
@@ -22,12 +35,31 @@ class PackageManager:
     """
 
     def __init__(self) -> None:
-        self.index_urls = package_index.DEFAULT_INDEX_URLS[:]
+        self.index_urls: tuple[str, ...] = package_index.DEFAULT_INDEX_URLS
 
-        self.repodata_packages: dict[str, dict[str, Any]] = REPODATA_PACKAGES
-        self.repodata_info: dict[str, str] = REPODATA_INFO
+        # The lock file data is shared by all PackageManager instances. Changes made
+        # through one instance go to its own overlay and never touch the shared base.
+        # (ChainMap only writes to its first map, so the base may be read-only.)
+        self.repodata_packages: MutableMapping[str, dict[str, Any]] = ChainMap(
+            {}, REPODATA_PACKAGES  # type: ignore[arg-type]
+        )
+        self.repodata_info: MutableMapping[str, str] = ChainMap(
+            {}, REPODATA_INFO  # type: ignore[arg-type]
+        )
 
-        pass
+        self._prefetch_tasks: builtins.list[asyncio.Task[None]] = []
+
+        # Installed distributions, as returned by list_installed_distributions(),
+        # along with the loaded packages and sys.path modification times they
+        # were listed with. Reading the distribution metadata is slow, so this is
+        # reused until packages are installed or uninstalled.
+        self._installed_distributions: (
+            tuple[
+                tuple[frozenset[str], tuple[tuple[str, int], ...]],
+                builtins.list[tuple[str, str, str]],
+            ]
+            | None
+        ) = None
 
     async def install(
         self,
@@ -36,9 +68,10 @@ class PackageManager:
         deps: bool = True,
         credentials: str | None = None,
         pre: bool = False,
-        index_urls: list[str] | str | None = None,
+        index_urls: list[str] | tuple[str, ...] | str | None = None,
         *,
         verbose: bool | int | None = None,
+        invalidate_caches: bool = True,
     ):
         """Install the given package and all of its dependencies.
 
@@ -126,19 +159,30 @@ class PackageManager:
             Print more information about the process. By default, micropip does not
             change logger level. Setting ``verbose=True`` will print similar
             information as pip.
+
+        invalidate_caches :
+            If ``True``, call :py:func:`importlib.invalidate_caches` after installing
+            so that the new packages can be imported. When installing many packages
+            one call at a time, you can pass ``False`` and call
+            :py:func:`importlib.invalidate_caches` once at the end instead.
         """
         if index_urls is None:
             index_urls = self.index_urls
 
-        return await install(
-            requirements,
-            index_urls,
-            keep_going,
-            deps,
-            credentials,
-            pre,
-            verbose=verbose,
-        )
+        try:
+            return await install(
+                requirements,
+                index_urls,
+                keep_going,
+                deps,
+                credentials,
+                pre,
+                verbose=verbose,
+                invalidate_caches=invalidate_caches,
+                repodata_packages=self.repodata_packages,
+            )
+        finally:
+            self._installed_distributions = None
 
     def list(self) -> PackageDict:
         """Get the dictionary of installed packages.
@@ -158,7 +202,21 @@ class PackageManager:
             >>> "regex" in package_list # doctest: +SKIP
             True
         """
-        return list_installed_packages(self.repodata_packages)
+        loaded_packages = loadedPackages.to_py()
+
+        # Packages loaded with pyodide.loadPackage() or installed by other means
+        # do not go through this PackageManager, so a change in loadedPackages or
+        # in the sys.path directories also invalidates the cache.
+        state = (frozenset(loaded_packages), sys_path_mtimes())
+        if (
+            self._installed_distributions is None
+            or self._installed_distributions[0] != state
+        ):
+            self._installed_distributions = (state, list_installed_distributions())
+
+        return list_installed_packages(
+            self.repodata_packages, self._installed_distributions[1], loaded_packages
+        )
 
     def freeze(self) -> str:
         """Produce a json string which can be used as the contents of the
@@ -172,7 +230,8 @@ class PackageManager:
         You can use your custom lock file by passing an appropriate url to the
         ``lockFileURL`` of :js:func:`~globalThis.loadPyodide`.
         """
-        return freeze_lockfile(self.repodata_packages, self.repodata_info)
+        lockfile = freeze_lockfile(self.repodata_packages, self.repodata_info)
+        return json_dumps(lockfile)
 
     def add_mock_package(
         self,
@@ -244,6 +303,8 @@ class PackageManager:
             persist between runs of python (assuming the file system persists).
             If it is False, modules will be stored inside micropip in memory only.
         """
+        from . import _mock_package
+
         return _mock_package.add_mock_package(
             name, version, modules=modules, persistent=persistent
         )
@@ -252,16 +313,24 @@ class PackageManager:
         """
         List all mock packages currently installed.
         """
+        from . import _mock_package
+
         return _mock_package.list_mock_packages()
 
     def remove_mock_package(self, name: str):
         """
         Remove a mock package.
         """
+        from . import _mock_package
+
         return _mock_package.remove_mock_package(name)
 
     def uninstall(
-        self, packages: str | builtins.list[str], *, verbose: bool | int = False
+        self,
+        packages: str | builtins.list[str],
+        *,
+        verbose: bool | int = False,
+        invalidate_caches: bool = True,
     ) -> None:
         """Uninstall the given packages.
 
@@ -282,10 +351,39 @@ class PackageManager:
             Print more information about the process.
             By default, micropip is silent. Setting ``verbose=True`` will print
             similar information as pip.
+
+        invalidate_caches
+            If ``True``, call :py:func:`importlib.invalidate_caches` after uninstalling.
+            When uninstalling many packages one call at a time, you can pass ``False``
+            and call :py:func:`importlib.invalidate_caches` once at the end instead.
+        """
+        try:
+            return uninstall(
+                packages, verbose=verbose, invalidate_caches=invalidate_caches
+            )
+        finally:
+            self._installed_distributions = None
+
+    def clear_index_cache(self) -> None:
+        """
+        Clear the cached state of the package indexes.
+
+        Lookups on an index that could not be reached fail right away for a
+        short while, so that retrying an install during an outage fails fast,
+        and project pages may be reused if caching them is enabled.
+        Call this to fetch fresh data, e.g. right after publishing a package,
+        or to retry failed indexes once they are reachable again.
         """
-        return uninstall(packages, verbose=verbose)
+        self._cancel_prefetch()
+        package_index.clear_index_cache()
 
-    def set_index_urls(self, urls: List[str] | str):  # noqa: UP006
+    def set_index_urls(
+        self,
+        urls: List[str] | tuple[str, ...] | str,  # noqa: UP006
+        *,
+        prefetch_project_list: bool = False,
+        fetch_kwargs: dict[str, Any] | None = None,
+    ):
         """
         Set the index URLs to use when looking up packages.
 
@@ -299,13 +397,43 @@ class PackageManager:
         - If a list of URLs is provided, micropip will try each URL in order until
             it finds a package. If no package is found, an error will be raised.
 
+
         Parameters
         ----------
         urls
             A list of URLs or a single URL to use as the package index.
+
+        prefetch_project_list
+            If ``True`` and an event loop is running, the project lists of the
+            given indexes (except PyPI) are fetched in the background. When an
+            index does not list a package, the next index is then queried for it
+            in parallel. Indexes are still used in order: a package is always
+            taken from the first index that has it. Project lists can weigh
+            several megabytes, so this is off by default.
+
+        fetch_kwargs
+            Keyword arguments to pass to the fetch function when fetching the
+            project lists, e.g. to pass credentials to a private index.
         """
 
-        if isinstance(urls, str):
-            urls = [urls]
+        self.index_urls = (urls,) if isinstance(urls, str) else tuple(urls)
+
+        # The project lists of the previous indexes are no longer needed.
+        self._cancel_prefetch()
+        if not prefetch_project_list:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._prefetch_tasks = [
+            loop.create_task(package_index.prefetch_project_names(url, fetch_kwargs))
+            for url in self.index_urls
+        ]
 
-        self.index_urls = urls[:]
+    def _cancel_prefetch(self) -> None:
+        for task in self._prefetch_tasks:
+            task.cancel()
+        self._prefetch_tasks = []
@@ -1,9 +1,12 @@
 import asyncio
+import graphlib
 import importlib.metadata
 import logging
 import warnings
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass, field
 from importlib.metadata import PackageNotFoundError
+from typing import Any
 from urllib.parse import urlparse
 
 from packaging.requirements import Requirement
@@ -28,31 +31,76 @@ class Transaction:
     deps: bool
     pre: bool
     fetch_kwargs: dict[str, str]
-    index_urls: list[str] | str
+    index_urls: list[str] | tuple[str, ...] | str
 
     locked: dict[str, PackageMetadata] = field(default_factory=dict)
     wheels: list[WheelInfo] = field(default_factory=list)
     pyodide_packages: list[PackageMetadata] = field(default_factory=list)
     failed: list[Requirement] = field(default_factory=list)
 
+    # Packages of the lock file, as seen by the PackageManager that runs the
+    # transaction (including the packages added to its overlay).
+    repodata_packages: Mapping[str, dict[str, Any]] = field(
+        default_factory=lambda: REPODATA_PACKAGES, repr=False
+    )
+
+    # In-flight or finished package index queries, keyed by (name, specifier).
+    # The same dependency often shows up in several subtrees of the dependency
+    # graph, so this makes sure it is queried at most once per transaction.
+    _index_queries: dict[tuple[str, str], "asyncio.Future[ProjectInfo]"] = field(
+        default_factory=dict, repr=False
+    )
+
+    # Installed version of each package looked up so far, or None if it is not
+    # installed. Nothing is installed while the transaction is resolved, so
+    # every package only needs to be looked up in the environment once.
+    _installed_versions: dict[str, str | None] = field(default_factory=dict, repr=False)
+
+    # Normalized names of the requirements of each wheel, keyed by the
+    # normalized name of the wheel. Used to install wheels in dependency order.
+    _wheel_requirements: dict[str, set[str]] = field(default_factory=dict, repr=False)
+
     verbose: bool | int | None = None
 
+    # Maximum number of wheels downloaded at the same time. Downloads start as
+    # soon as a wheel is selected, so without a limit a large dependency tree
+    # would saturate the browser's per-host connection pool.
+    max_concurrent_downloads: int = 8
+
+    # Maximum number of package index queries running at the same time.
+    # Requirements are resolved concurrently, so a wide dependency tree would
+    # otherwise send a burst of requests to the index.
+    max_concurrent_index_queries: int = 8
+
     def __post_init__(self):
         # If index_urls is None, pyodide-lock.json have to be searched first.
         # TODO: when PyPI starts to support hosting WASM wheels, this might be deleted.
-        self.search_pyodide_lock_first = (
-            self.index_urls == package_index.DEFAULT_INDEX_URLS
+        self.search_pyodide_lock_first = not isinstance(self.index_urls, str) and (
+            tuple(self.index_urls) == package_index.DEFAULT_INDEX_URLS
+        )
+
+        self._download_semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+        self._index_query_semaphore = asyncio.Semaphore(
+            self.max_concurrent_index_queries
         )
 
     async def gather_requirements(
         self,
-        requirements: list[str] | list[Requirement],
+        requirements: Iterable[str | Requirement],
     ) -> None:
         requirement_promises = [
-            self.add_requirement(requirement) for requirement in requirements
+            asyncio.ensure_future(self.add_requirement(requirement))
+            for requirement in requirements
         ]
 
-        await asyncio.gather(*requirement_promises)
+        try:
+            await asyncio.gather(*requirement_promises)
+        except BaseException:
+            # Stop resolving (and downloading) the other requirements:
+            # the transaction has failed anyway.
+            for promise in requirement_promises:
+                promise.cancel()
+            raise
 
     async def add_requirement(self, req: str | Requirement) -> None:
         if isinstance(req, Requirement):
@@ -68,11 +116,15 @@ class Transaction:
         await self.add_wheel(wheel, extras=set(), specifier="")
 
     def check_version_satisfied(self, req: Requirement) -> tuple[bool, str]:
-        ver = None
-        try:
-            ver = importlib.metadata.version(req.name)
-        except PackageNotFoundError:
-            pass
+        if req.name not in self._installed_versions:
+            try:
+                self._installed_versions[req.name] = importlib.metadata.version(
+                    req.name
+                )
+            except PackageNotFoundError:
+                self._installed_versions[req.name] = None
+
+        ver = self._installed_versions[req.name]
         if req.name in self.locked:
             ver = self.locked[req.name].version
 
@@ -177,10 +229,12 @@ class Transaction:
         Find requirement from pyodide-lock.json. If the requirement is found,
         add it to the package list and return True. Otherwise, return False.
         """
-        if req.name in REPODATA_PACKAGES and req.specifier.contains(
-            REPODATA_PACKAGES[req.name]["version"], prereleases=True
-        ):
-            version = REPODATA_PACKAGES[req.name]["version"]
+        package = self.repodata_packages.get(req.name)
+        if package is None:
+            return False
+
+        version = package["version"]
+        if req.specifier.contains(version, prereleases=True):
             self.pyodide_packages.append(
                 PackageMetadata(name=req.name, version=str(version), source="pyodide")
             )
@@ -193,26 +247,48 @@ class Transaction:
         Find requirement from package index. If the requirement is found,
         add it to the package list and return True. Otherwise, return False.
         """
-        metadata = await package_index.query_package(
-            req.name,
-            self.index_urls,
-            self.fetch_kwargs,
-        )
+        metadata = await self._query_package(req)
 
         logger.debug("Transaction: got metadata %r for requirement %r", metadata, req)
 
-        wheel = find_wheel(metadata, req)
-
-        logger.debug("Transaction: Selected wheel: %r", wheel)
-
         # Maybe while we were downloading pypi_json some other branch
         # installed the wheel?
         satisfied, ver = self.check_version_satisfied(req)
         if satisfied:
             logger.info("Requirement already satisfied: %s (%s)", req, ver)
+            return
+
+        wheel = find_wheel(metadata, req)
+
+        logger.debug("Transaction: Selected wheel: %r", wheel)
 
         await self.add_wheel(wheel, req.extras, specifier=str(req.specifier))
 
+    async def _query_package(self, req: Requirement) -> ProjectInfo:
+        """
+        Query the package index for a requirement. Concurrent and repeated
+        queries for the same (name, specifier) share a single request.
+        """
+        key = (req.name, str(req.specifier))
+        if key not in self._index_queries:
+            self._index_queries[key] = asyncio.ensure_future(
+                self._query_package_index(req.name)
+            )
+
+        return await self._index_queries[key]
+
+    async def _query_package_index(self, name: str) -> ProjectInfo:
+        async with self._index_query_semaphore:
+            return await package_index.query_package(
+                name,
+                self.index_urls,
+                self.fetch_kwargs,
+            )
+
+    async def _download_wheel(self, wheel: WheelInfo) -> None:
+        async with self._download_semaphore:
+            await wheel.download(self.fetch_kwargs)
+
     async def add_wheel(
         self,
         wheel: WheelInfo,
@@ -247,31 +323,73 @@ class Transaction:
         logger.info("Collecting %s%s", wheel.name, specifier)
         logger.info("  Downloading %s", wheel.url.split("/")[-1])
 
-        wheel_download_task = asyncio.create_task(wheel.download(self.fetch_kwargs))
-        if self.deps:
-            # Case 1) If metadata file is available,
-            #         we can gather requirements without waiting for the wheel to be downloaded.
-            if wheel.pep658_metadata_available():
-                try:
-                    await wheel.download_pep658_metadata(self.fetch_kwargs)
-                except OSError:
-                    # If something goes wrong while downloading the metadata,
-                    # we have to wait for the wheel to be downloaded.
+        wheel_download_task = asyncio.create_task(self._download_wheel(wheel))
+        try:
+            if self.deps:
+                # Case 1) If metadata file is available,
+                #         we can gather requirements without waiting for the wheel to be downloaded.
+                #         The wheel keeps downloading in the background meanwhile.
+                if wheel.pep658_metadata_available():
+                    try:
+                        await wheel.download_pep658_metadata(self.fetch_kwargs)
+                    except OSError:
+                        # If something goes wrong while downloading the metadata,
+                        # we have to wait for the wheel to be downloaded.
+                        await wheel_download_task
+
+                # Case 2) If metadata file is not available,
+                #         we have to wait for the wheel to be downloaded.
+                else:
                     await wheel_download_task
 
-                await asyncio.gather(
-                    self.gather_requirements(wheel.requires(extras)),
-                    wheel_download_task,
-                )
-
-            # Case 2) If metadata file is not available,
-            #         we have to wait for the wheel to be downloaded.
-            else:
-                await wheel_download_task
-                await self.gather_requirements(wheel.requires(extras))
+                requirements = wheel.requires(extras)
+                self._wheel_requirements[normalized_name] = {
+                    canonicalize_name(req.name) for req in requirements
+                }
+                await self.gather_requirements(requirements)
+        except BaseException:
+            # Do not leave the download running in the background (or its
+            # error unretrieved) once resolving this wheel has failed.
+            wheel_download_task.cancel()
+            await asyncio.gather(wheel_download_task, return_exceptions=True)
+            raise
+
+        # The wheel must be downloaded before it can be installed, even if we
+        # did not need it to resolve the dependencies.
+        await wheel_download_task
 
         self.wheels.append(wheel)
 
+    def install_layers(self) -> list[list[WheelInfo]]:
+        """
+        Split the wheels into layers that are installed one after another.
+
+        Every wheel is in a later layer than the wheels it depends on, so the
+        wheels in a layer can be installed concurrently. If the dependencies
+        form a cycle, all wheels are returned in a single layer.
+        """
+        wheels: dict[str, WheelInfo] = {
+            canonicalize_name(wheel.name): wheel for wheel in self.wheels
+        }
+
+        sorter: graphlib.TopologicalSorter[str] = graphlib.TopologicalSorter()
+        for name in wheels:
+            requirements = self._wheel_requirements.get(name, set())
+            sorter.add(name, *(req for req in requirements if req in wheels))
+
+        try:
+            sorter.prepare()
+        except graphlib.CycleError:
+            return [self.wheels] if self.wheels else []
+
+        layers = []
+        while sorter.is_active():
+            ready = sorter.get_ready()
+            layers.append([wheels[name] for name in ready])
+            sorter.done(*ready)
+
+        return layers
+
 
 def find_wheel(metadata: ProjectInfo, req: Requirement) -> WheelInfo:
     """Parse metadata to find the latest version of pure python wheel.
@@ -309,9 +427,12 @@ def find_wheel(metadata: ProjectInfo, req: Requirement) -> WheelInfo:
             if tag_index is not None and tag_index < best_tag_index:
                 best_wheel = wheel
                 best_tag_index = tag_index
+                if tag_index == 0:
+                    # No other wheel can be more specific.
+                    break
 
         if best_wheel is not None:
-            return wheel
+            return best_wheel
 
     raise ValueError(
         f"Can't find a pure Python 3 wheel for '{req}'.\n"
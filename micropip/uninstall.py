@@ -1,20 +1,36 @@
 import importlib
 import importlib.metadata
+import os
 from importlib.metadata import Distribution
 
+from packaging.utils import canonicalize_name
+
 from ._compat import loadedPackages
-from ._utils import get_files_in_distribution, get_root
+from ._utils import get_files_in_distribution, get_root, to_list
 from .logging import setup_logging
 
 
-def uninstall(packages: str | list[str], *, verbose: bool | int = False) -> None:
+def uninstall(
+    packages: str | list[str],
+    *,
+    verbose: bool | int = False,
+    invalidate_caches: bool = True,
+) -> None:
     with setup_logging().ctx_level(verbose) as logger:
 
-        if isinstance(packages, str):
-            packages = [packages]
-
+        # Drop duplicates, e.g. the same package spelled with different cases,
+        # so that each distribution is only looked up and removed once.
+        requested = {
+            canonicalize_name(package): package for package in to_list(packages)
+        }
+        if not requested:
+            return
+
+        # Note: importlib.metadata.distribution() finds a distribution through a
+        # name index of each sys.path entry, so this does not read the metadata
+        # of every installed distribution.
         distributions: list[Distribution] = []
-        for package in packages:
+        for package in requested.values():
             try:
                 dist = importlib.metadata.distribution(package)
                 distributions.append(dist)
@@ -29,20 +45,24 @@ def uninstall(packages: str | list[str], *, verbose: bool | int = False) -> None
 
             logger.info("Found existing installation: %s %s", name, version)
 
-            root = get_root(dist)
+            # Work on path strings instead of Path objects: Path.is_relative_to()
+            # and Path.parent split the path into parts on every call.
+            root = os.fspath(get_root(dist))
+            root_prefix = root + os.sep
             files = get_files_in_distribution(dist)
-            directories = set()
+            directories: set[str] = set()
 
-            for file in files:
-                if not file.is_file():
-                    if not file.is_relative_to(root):
+            for file in map(os.fspath, files):
+                if not _unlink_file(file):
+                    if not file.startswith(root_prefix):
                         # This file is not in the site-packages directory. Probably one of:
                         # - data_files
                         # - scripts
                         # - entry_points
                         # Since we don't support these, we can ignore them (except for data_files (TODO))
                         logger.warning(
-                            "skipping file '%s' that is relative to root",
+                            "skipping file '%s' that is not relative to root",
+                            file,
                         )
                         continue
                     # see PR 130, it is likely that this is never triggered since Python 3.12
@@ -55,17 +75,16 @@ def uninstall(packages: str | list[str], *, verbose: bool | int = False) -> None
 
                     continue
 
-                file.unlink()
-
-                if file.parent != root:
-                    directories.add(file.parent)
+                parent = os.path.dirname(file)
+                if parent != root:
+                    directories.add(parent)
 
             # Remove directories in reverse hierarchical order
             for directory in sorted(
-                directories, key=lambda x: len(x.parts), reverse=True
+                directories, key=lambda x: x.count(os.sep), reverse=True
             ):
                 try:
-                    directory.rmdir()
+                    os.rmdir(directory)
                 except OSError:
                     logger.warning(
                         "A directory '%s' is not empty after uninstallation of '%s'. "
@@ -82,4 +101,24 @@ def uninstall(packages: str | list[str], *, verbose: bool | int = False) -> None
 
             logger.info("Successfully uninstalled %s-%s", name, version)
 
-        importlib.invalidate_caches()
+        if invalidate_caches and distributions:
+            importlib.invalidate_caches()
+
+
+def _unlink_file(path: str) -> bool:
+    """
+    Remove a file. Return False if there is no file at the given path.
+
+    The file is removed directly instead of checking that it is a file first:
+    this saves a stat() call per file in the common case.
+    """
+    try:
+        os.unlink(path)
+    except OSError:
+        # Unlinking a directory fails with IsADirectoryError on Linux but with
+        # PermissionError on macOS, so check what the entry is.
+        if os.path.isfile(path):
+            raise
+        return False
+
+    return True
@@ -21,6 +21,12 @@ from ._utils import parse_wheel_filename
 from .metadata import Metadata, safe_name, wheel_dist_info_dir
 from .types import DistributionMetadata
 
+# URL schemes that wheels can be downloaded from.
+_FETCHABLE_SCHEMES = frozenset({"https", "http", "emfs", "file"})
+
+# Hosts known to send CORS headers: a failed download from these is not a CORS issue.
+_CORS_ENABLED_HOSTS = frozenset({"files.pythonhosted.org", "cdn.jsdelivr.net"})
+
 
 @dataclass
 class PackageData:
@@ -29,7 +35,9 @@ class PackageData:
     shared_library: bool
 
 
-@dataclass
+# A project page lists a WheelInfo for every compatible file of every release,
+# so slots are used to keep the instances small.
+@dataclass(slots=True)
 class WheelInfo:
     """
     WheelInfo represents a wheel file and its metadata (e.g. URL and hash)
@@ -49,6 +57,7 @@ class WheelInfo:
     # Fields below are only available after downloading the wheel, i.e. after calling `download()`.
 
     _data: bytes | None = field(default=None, repr=False)  # Wheel file contents.
+    _data_sha256: str | None = field(default=None, repr=False)  # Hash of `_data`.
     _metadata: Metadata | None = None  # Wheel metadata.
     _requires: list[Requirement] | None = None  # List of requirements.
 
@@ -56,6 +65,10 @@ class WheelInfo:
     # This is only available after extracting the wheel, i.e. after calling `extract()`.
     _dist_info: Path | None = None
 
+    # Derived from the fields above in __post_init__().
+    _project_name: str = field(init=False, repr=False, compare=False)
+    metadata_url: str = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
         assert (
             self.url.startwith(p) for p in ("http:", "https:", "emfs:", "file:")
@@ -127,7 +140,7 @@ class WheelInfo:
             raise RuntimeError(
                 "Micropip internal error: attempted to install wheel before downloading it?"
             )
-        _validate_sha256_checksum(self._data, self.sha256)
+        _validate_sha256_checksum(self._data, self.sha256, actual=self._checksum())
         self._extract(target)
         await self._load_libraries(target)
         self._set_installer()
@@ -137,6 +150,9 @@ class WheelInfo:
             return
 
         self._data = await self._fetch_bytes(self.url, fetch_kwargs)
+        # Hash right away, while other wheels are still downloading,
+        # rather than serially at install time.
+        self._checksum()
 
         # The wheel's metadata might be downloaded separately from the wheel itself.
         # If it is not downloaded yet or if the metadata is not available, extract it from the wheel.
@@ -187,7 +203,7 @@ class WheelInfo:
         return requires
 
     async def _fetch_bytes(self, url: str, fetch_kwargs: dict[str, Any]):
-        if self.parsed_url.scheme not in ("https", "http", "emfs", "file"):
+        if self.parsed_url.scheme not in _FETCHABLE_SCHEMES:
             # Don't raise ValueError it gets swallowed
             raise TypeError(
                 f"Cannot download from a non-remote location: {url!r} ({self.parsed_url!r})"
@@ -196,10 +212,7 @@ class WheelInfo:
             bytes = await fetch_bytes(url, fetch_kwargs)
             return bytes
         except OSError as e:
-            if self.parsed_url.hostname in [
-                "files.pythonhosted.org",
-                "cdn.jsdelivr.net",
-            ]:
+            if self.parsed_url.hostname in _CORS_ENABLED_HOSTS:
                 raise e
             else:
                 raise ValueError(
@@ -209,6 +222,15 @@ class WheelInfo:
                     "Check if the server is sending the correct 'Access-Control-Allow-Origin' header."
                 ) from e
 
+    def _checksum(self) -> str:
+        """
+        SHA-256 of the wheel file contents, computed only once per download.
+        """
+        assert self._data
+        if self._data_sha256 is None:
+            self._data_sha256 = _generate_package_hash(self._data)
+        return self._data_sha256
+
     def _extract(self, target: Path) -> None:
         assert self._data
         with zipfile.ZipFile(io.BytesIO(self._data)) as zf:
@@ -224,7 +246,7 @@ class WheelInfo:
 
         self._write_dist_info("PYODIDE_SOURCE", wheel_source)
         self._write_dist_info("PYODIDE_URL", self.url)
-        self._write_dist_info("PYODIDE_SHA256", _generate_package_hash(self._data))
+        self._write_dist_info("PYODIDE_SHA256", self._checksum())
         self._write_dist_info("INSTALLER", "micropip")
         if self._requires:
             self._write_dist_info(
@@ -253,13 +275,17 @@ class WheelInfo:
         await loadDynlibsFromPackage(pkg, dynlibs)
 
 
-def _validate_sha256_checksum(data: bytes, expected: str | None = None) -> None:
+def _validate_sha256_checksum(
+    data: bytes, expected: str | None = None, *, actual: str | None = None
+) -> None:
     if expected is None:
         # No checksums available, e.g. because installing
         # from a different location than PyPI.
         return
 
-    actual = _generate_package_hash(data)
+    # The digest of `data` can be passed as `actual` if it is already known.
+    if actual is None:
+        actual = _generate_package_hash(data)
     if actual != expected:
         raise RuntimeError(f"Invalid checksum: expected {expected}, got {actual}")
 
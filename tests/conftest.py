@@ -179,6 +179,7 @@ def mock_platform(monkeypatch):
     from micropip import _utils
 
     _utils.sys_tags.cache_clear()
+    _utils._sys_tag_ranks.cache_clear()
     monkeypatch.setattr(_utils, "get_platform", lambda: PLATFORM)
 
 
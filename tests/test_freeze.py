@@ -66,6 +66,27 @@ async def test_freeze_fix_depends(
     assert dep2_metadata["imports"] == toplevel[2]
 
 
+@pytest.mark.asyncio
+async def test_freeze_overrides_lockfile_entry(
+    mock_fetch: mock_fetch_cls, mock_importlib: None
+) -> None:
+    import importlib
+
+    import micropip
+
+    # micropip.freeze is shadowed by the PackageManager method in micropip/__init__.py
+    freeze = importlib.import_module("micropip.freeze")
+
+    dummy = "dummy"
+    mock_fetch.add_pkg_version(dummy)
+    await micropip.install(dummy)
+
+    lockfile_packages = {dummy: {"name": dummy, "version": "0.0.1"}}
+    lockfile = freeze.freeze_lockfile(lockfile_packages, {})
+
+    assert lockfile["packages"][dummy]["version"] == "1.0.0"
+
+
 def test_freeze_lockfile_compat(selenium_standalone_micropip, wheel_catalog, tmp_path):
     from pyodide_lock import PyodideLockSpec
 
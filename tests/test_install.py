@@ -204,6 +204,72 @@ async def test_install_no_deps(mock_fetch: mock_fetch_cls) -> None:
     assert dep not in micropip.list()
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("requirements", [[], "", " ", ["", "  "]])
+async def test_install_no_requirements(requirements, monkeypatch) -> None:
+    import importlib
+
+    install = importlib.import_module("micropip.install")
+
+    def mock_transaction(*args, **kwargs):
+        raise AssertionError("Transaction should not be created")
+
+    monkeypatch.setattr(install, "Transaction", mock_transaction)
+
+    await micropip.install(requirements)
+
+
+@pytest.mark.asyncio
+async def test_install_already_satisfied(
+    mock_fetch: mock_fetch_cls, monkeypatch
+) -> None:
+    import importlib
+
+    install = importlib.import_module("micropip.install")
+
+    mock_fetch.add_pkg_version("dummy", "1.0.0")
+    await micropip.install("dummy")
+
+    def mock_transaction(*args, **kwargs):
+        raise AssertionError("Transaction should not be created")
+
+    monkeypatch.setattr(install, "Transaction", mock_transaction)
+
+    await micropip.install("dummy")
+    await micropip.install(["dummy>=1.0"])
+
+    with pytest.raises(AssertionError):
+        await micropip.install("dummy>=2.0")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("invalidate_caches", [True, False])
+async def test_install_invalidate_caches(
+    mock_fetch: mock_fetch_cls, monkeypatch, invalidate_caches
+) -> None:
+    import importlib
+
+    calls = 0
+
+    def mock_invalidate_caches():
+        nonlocal calls
+        calls += 1
+
+    monkeypatch.setattr(importlib, "invalidate_caches", mock_invalidate_caches)
+
+    dummy = "dummy"
+    mock_fetch.add_pkg_version(dummy)
+
+    await micropip.install(dummy, invalidate_caches=invalidate_caches)
+
+    assert calls == int(invalidate_caches)
+
+    # Nothing is installed, as the requirement is already satisfied
+    await micropip.install(f"{dummy}[extra]", invalidate_caches=invalidate_caches)
+
+    assert calls == int(invalidate_caches)
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("pre", [True, False])
 async def test_install_pre(
@@ -222,6 +288,34 @@ async def test_install_pre(
     assert micropip.list()[dummy].version == version_should_select
 
 
+@pytest.mark.asyncio
+async def test_install_reports_all_failed_wheels(
+    mock_fetch: mock_fetch_cls, monkeypatch
+) -> None:
+    import asyncio
+
+    from micropip import wheelinfo
+
+    mock_fetch.add_pkg_version("a")
+    mock_fetch.add_pkg_version("b")
+
+    finished = []
+
+    async def failing_install(self, target):
+        await asyncio.sleep(0.01 if self.name == "b" else 0)
+        finished.append(self.name)
+        raise RuntimeError(f"cannot install {self.name}")
+
+    monkeypatch.setattr(wheelinfo.WheelInfo, "install", failing_install)
+
+    with pytest.raises(RuntimeError, match="cannot install") as exc_info:
+        await micropip.install(["a", "b"])
+
+    # The slower install is not abandoned when the first one fails
+    assert sorted(finished) == ["a", "b"]
+    assert len(exc_info.value.__notes__) == 1
+
+
 @pytest.mark.asyncio
 async def test_fetch_wheel_fail(monkeypatch, wheel_base):
     pytest.importorskip("packaging")
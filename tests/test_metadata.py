@@ -88,3 +88,21 @@ def test_Metadata_extra_of_requires():
 
     assert "botocore" in reqs_set
     assert reqs_set["botocore"] == {"crt"}
+
+
+def test_Metadata_requires_shared_by_extras():
+    from micropip.metadata import Metadata
+
+    metadata = (
+        b"Metadata-Version: 2.1\n"
+        b"Name: dummy\n"
+        b"Version: 1.0.0\n"
+        b"Provides-Extra: a\n"
+        b"Provides-Extra: b\n"
+        b'Requires-Dist: shared; extra == "a" or extra == "b"\n'
+    )
+    m = Metadata(metadata)
+
+    reqs = m.requires(("a", "b"))
+
+    assert [r.name for r in reqs] == ["shared"]
@@ -1,5 +1,8 @@
+from collections import OrderedDict
+
 import pytest
 from conftest import TEST_PYPI_RESPONSE_DIR
+from packaging.version import Version
 
 import micropip.package_index as package_index
 
@@ -31,6 +34,24 @@ def test_project_info_from_json(name):
     _check_project_info(info)
 
 
+def test_project_info_from_json_skips_other_platforms(monkeypatch):
+    checked = []
+
+    def is_package_compatible(filename):
+        checked.append(filename)
+        return True
+
+    monkeypatch.setattr(package_index, "is_package_compatible", is_package_compatible)
+
+    test_file = TEST_PYPI_RESPONSE_DIR / "numpy_json.json"
+    info = package_index.ProjectInfo.from_json_api(test_file.read_bytes())
+    for files in info.releases.values():
+        list(files)
+
+    assert checked
+    assert not any(name.endswith(("win_amd64.whl", ".tar.gz")) for name in checked)
+
+
 @pytest.mark.parametrize(
     "name", ["numpy", "black", "pytest", "snowballstemmer", "pytz"]
 )
@@ -106,6 +127,37 @@ def test_project_info_equal(name):
             assert f_json.sha256 == f_simple_json.sha256
 
 
+@pytest.mark.parametrize(
+    "file_metadata, expected",
+    [
+        ({"core-metadata": {"sha256": "abc"}}, {"sha256": "abc"}),
+        ({"core-metadata": True, "dist-info-metadata": False}, True),
+        ({"dist-info-metadata": {"sha256": "abc"}}, {"sha256": "abc"}),
+        ({"core-metadata": False}, None),
+        ({}, None),
+    ],
+)
+def test_project_info_core_metadata(file_metadata, expected):
+    filename = "dummy-1.0.0-py3-none-any.whl"
+    project_info = package_index.ProjectInfo.from_simple_json_api(
+        {
+            "name": "dummy",
+            "files": [
+                {
+                    "filename": filename,
+                    "url": f"https://example.com/{filename}",
+                    "hashes": {"sha256": "0" * 64},
+                    **file_metadata,
+                }
+            ],
+        }
+    )
+
+    [wheel] = list(project_info.releases[Version("1.0.0")])
+    assert wheel.core_metadata == expected
+    assert wheel.pep658_metadata_available() == (expected is not None)
+
+
 def test_contain_placeholder():
     assert package_index._contain_placeholder("https://pkg-index.com/{package_name}/")
     assert package_index._contain_placeholder(
@@ -149,3 +201,306 @@ async def test_query_package(mock_fixture, pkg1, pkg2, request):
 
     with pytest.raises(ValueError, match="Can't fetch metadata"):
         await package_index.query_package(pkg1, index_urls=[pkg2_index_url])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type", ["json", "html"])
+async def test_prefetch_project_names(
+    mock_package_index_simple_json_api, httpserver, monkeypatch, content_type
+):
+    from urllib.parse import urlparse
+
+    monkeypatch.setattr(package_index, "_index_page_requests", {})
+    monkeypatch.setattr(package_index, "_index_projects", {})
+
+    other_index_url = mock_package_index_simple_json_api(
+        pkgs=["black"], pkgs_not_found=["pytest"]
+    )
+    index_url = mock_package_index_simple_json_api(pkgs=["pytest"])
+    other_index_path = urlparse(other_index_url).path
+
+    if content_type == "json":
+        httpserver.expect_request(f"{other_index_path}/").respond_with_json(
+            {"meta": {"api-version": "1.0"}, "projects": [{"name": "Black"}]},
+            content_type="application/vnd.pypi.simple.v1+json",
+        )
+    else:
+        httpserver.expect_request(f"{other_index_path}/").respond_with_data(
+            "<!DOCTYPE html><html><body><a href='/black/'>Black</a></body></html>",
+            content_type="text/html",
+        )
+
+    await package_index.prefetch_project_names(other_index_url + "/")
+    _, projects = package_index._index_projects[other_index_url]
+    assert projects == {"black"}
+
+    # pytest is not listed in the first index, so the second one is queried
+    # in parallel, but the first one is still checked before it is used.
+    project_info = await package_index.query_package(
+        "pytest", index_urls=[other_index_url, index_url]
+    )
+    assert project_info.name == "pytest"
+    assert any(
+        request.path == f"{other_index_path}/pytest/" for request, _ in httpserver.log
+    )
+
+
+@pytest.mark.asyncio
+async def test_project_list_never_reorders_indexes(
+    mock_package_index_simple_json_api, httpserver, monkeypatch
+):
+    from urllib.parse import urlparse
+
+    monkeypatch.setattr(package_index, "_index_page_requests", {})
+    monkeypatch.setattr(package_index, "_index_projects", {})
+    monkeypatch.setattr(package_index, "_index_responses", OrderedDict())
+
+    # The private index hosts pytest, but its project list is incomplete
+    private_index_url = mock_package_index_simple_json_api(pkgs=["pytest"])
+    httpserver.expect_request(f"{urlparse(private_index_url).path}/").respond_with_json(
+        {"meta": {"api-version": "1.0"}, "projects": [{"name": "black"}]},
+        content_type="application/vnd.pypi.simple.v1+json",
+    )
+    # A lower priority index serves another project under the same name
+    public_index_url = mock_package_index_simple_json_api(pkgs=[])
+    httpserver.expect_request(
+        f"{urlparse(public_index_url).path}/pytest/"
+    ).respond_with_data(
+        (TEST_PYPI_RESPONSE_DIR / "black_simple.json").read_bytes(),
+        content_type="application/vnd.pypi.simple.v1+json",
+    )
+
+    await package_index.prefetch_project_names(private_index_url)
+    assert package_index._known_missing("pytest", private_index_url)
+
+    project_info = await package_index.query_package(
+        "pytest", index_urls=[private_index_url, public_index_url]
+    )
+    assert project_info.name == "pytest"
+
+
+@pytest.mark.asyncio
+async def test_project_list_expires(monkeypatch):
+    monkeypatch.setattr(
+        package_index,
+        "_index_projects",
+        {"https://index.test/simple": (0.0, frozenset({"black"}))},
+    )
+
+    assert not package_index._known_missing("pytest", "https://index.test/simple/")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_url", ["PYPI", "https://pypi.org/simple/"])
+async def test_prefetch_project_names_skips_pypi(index_url, monkeypatch):
+    async def fetch_string_and_headers(url, kwargs):
+        raise AssertionError(f"unexpected request to {url}")
+
+    monkeypatch.setattr(
+        package_index, "fetch_string_and_headers", fetch_string_and_headers
+    )
+
+    await package_index.prefetch_project_names(index_url)
+
+
+@pytest.mark.asyncio
+async def test_unreachable_index_fails_fast(
+    mock_package_index_simple_json_api, httpserver, monkeypatch
+):
+    from urllib.parse import urlparse
+
+    monkeypatch.setattr(package_index, "_unreachable_indexes", {})
+
+    broken_index_url = "https://unreachable.test/simple"
+    index_url = mock_package_index_simple_json_api(pkgs=["pytest"])
+
+    broken_requests = []
+    fetch_string_and_headers = package_index.fetch_string_and_headers
+
+    async def fetch_or_fail(url, kwargs):
+        if url.startswith(broken_index_url):
+            broken_requests.append(url)
+            raise ConnectionRefusedError(url)
+        return await fetch_string_and_headers(url, kwargs)
+
+    monkeypatch.setattr(package_index, "fetch_string_and_headers", fetch_or_fail)
+
+    with pytest.raises(ConnectionRefusedError):
+        await package_index.query_package(
+            "pytest", index_urls=[broken_index_url, index_url]
+        )
+    assert len(broken_requests) == 1
+
+    # While the broken index is marked as unreachable, lookups fail without
+    # requesting it again, and the next index is not used in its place.
+    with pytest.raises(ValueError, match=r"failed recently, retry after \d+s"):
+        await package_index.query_package(
+            "black", index_urls=[broken_index_url, index_url]
+        )
+    assert len(broken_requests) == 1
+    assert not any(
+        request.path.startswith(urlparse(index_url).path)
+        for request, _ in httpserver.log
+    )
+
+    package_index.clear_index_cache()
+    with pytest.raises(ConnectionRefusedError):
+        await package_index.query_package("pytest", index_urls=[broken_index_url])
+    assert len(broken_requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_server_error_does_not_block_index(
+    mock_package_index_simple_json_api, httpserver, monkeypatch
+):
+    from urllib.parse import urlparse
+
+    from micropip._compat import HttpStatusError
+
+    monkeypatch.setattr(package_index, "_unreachable_indexes", {})
+
+    index_url = mock_package_index_simple_json_api(pkgs=["black"])
+    httpserver.expect_request(f"{urlparse(index_url).path}/pytest/").respond_with_data(
+        "", status=503
+    )
+
+    with pytest.raises(HttpStatusError):
+        await package_index.query_package("pytest", index_url)
+
+    # Only the page that failed is affected
+    project_info = await package_index.query_package("black", index_url)
+    assert project_info.name == "black"
+
+    with pytest.raises(HttpStatusError):
+        await package_index.query_package("pytest", index_url)
+    assert sum(request.path.endswith("/pytest/") for request, _ in httpserver.log) == 2
+
+
+def _serve_with_cache_control(httpserver, pkgs, cache_control):
+    import secrets
+
+    base = secrets.token_hex(16)
+    for pkg in pkgs:
+        httpserver.expect_request(f"/{base}/{pkg}/").respond_with_data(
+            (TEST_PYPI_RESPONSE_DIR / f"{pkg}_simple.json").read_bytes(),
+            content_type="application/vnd.pypi.simple.v1+json",
+            headers={"Cache-Control": cache_control},
+        )
+
+    return httpserver.url_for(base)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cache_size, cache_control, requests",
+    [
+        (0, "max-age=600", 2),
+        (10**8, "max-age=600", 1),
+        (10**8, "max-age=600, no-cache", 2),
+        (10**8, "public", 2),
+    ],
+)
+async def test_index_responses_are_reused(
+    cache_size, cache_control, requests, httpserver, monkeypatch
+):
+    monkeypatch.setattr(package_index, "_index_responses", OrderedDict())
+    monkeypatch.setattr(package_index, "INDEX_RESPONSE_CACHE_SIZE", cache_size)
+
+    index_url = _serve_with_cache_control(httpserver, ["pytest"], cache_control)
+
+    def count_requests():
+        return sum(request.path.endswith("/pytest/") for request, _ in httpserver.log)
+
+    for _ in range(2):
+        project_info = await package_index.query_package("pytest", index_url)
+        assert project_info.name == "pytest"
+    assert count_requests() == requests
+
+    package_index.clear_index_cache()
+    await package_index.query_package("pytest", index_url)
+    assert count_requests() == requests + 1
+
+
+def test_cache_lifetime_is_capped():
+    assert package_index._cache_lifetime({"cache-control": "max-age=5"}) == 5
+    assert (
+        package_index._cache_lifetime({"cache-control": "max-age=600"})
+        == package_index.INDEX_RESPONSE_TTL
+    )
+    assert package_index._cache_lifetime({"cache-control": "max-age=abc"}) == 0
+    assert package_index._cache_lifetime({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_index_responses_are_bounded(httpserver, monkeypatch):
+    pkgs = ["pytest", "black", "numpy"]
+    sizes = {
+        pkg: len((TEST_PYPI_RESPONSE_DIR / f"{pkg}_simple.json").read_text())
+        for pkg in pkgs
+    }
+    monkeypatch.setattr(
+        package_index, "INDEX_RESPONSE_CACHE_SIZE", sizes["black"] + sizes["numpy"]
+    )
+    monkeypatch.setattr(
+        package_index,
+        "_index_responses",
+        OrderedDict({("https://index.test/expired/", "{}"): (0.0, "", {})}),
+    )
+
+    index_url = _serve_with_cache_control(httpserver, pkgs, "max-age=600")
+    for name in pkgs:
+        await package_index.query_package(name, index_url)
+
+    # The expired entry and the least recently used page are dropped
+    assert [url for url, _ in package_index._index_responses] == [
+        f"{index_url}/black/",
+        f"{index_url}/numpy/",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_a_request(
+    mock_package_index_simple_json_api, httpserver, monkeypatch
+):
+    import asyncio
+
+    monkeypatch.setattr(package_index, "_index_page_requests", {})
+    monkeypatch.setattr(package_index, "_index_responses", OrderedDict())
+
+    index_url = mock_package_index_simple_json_api(pkgs=["pytest"])
+
+    project_infos = await asyncio.gather(
+        *(package_index.query_package("pytest", index_url) for _ in range(3))
+    )
+
+    assert all(project_info.name == "pytest" for project_info in project_infos)
+    # Each query gets its own ProjectInfo, as releases are single-use generators.
+    assert len({id(project_info) for project_info in project_infos}) == 3
+    assert sum(request.path.endswith("/pytest/") for request, _ in httpserver.log) == 1
+    assert not package_index._index_page_requests
+
+
+def test_request_left_by_closed_loop_is_not_reused(
+    mock_package_index_simple_json_api, monkeypatch
+):
+    import asyncio
+
+    monkeypatch.setattr(package_index, "_index_page_requests", {})
+    monkeypatch.setattr(package_index, "_index_responses", OrderedDict())
+
+    index_url = mock_package_index_simple_json_api(pkgs=["pytest"])
+
+    async def start_request():
+        package_index._request_index_page(
+            f"{index_url}/pytest/", package_index._prepare_fetch_kwargs(None)
+        )
+
+    # e.g. a speculative request for the next index, still in flight when the
+    # event loop that started it is closed
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(start_request())
+    loop.close()
+    assert package_index._index_page_requests
+
+    project_info = asyncio.run(package_index.query_package("pytest", index_url))
+    assert project_info.name == "pytest"
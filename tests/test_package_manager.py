@@ -26,15 +26,61 @@ def test_set_index_urls():
     valid_url3 = "https://another-pkg-index.com/simple/"
     try:
         manager.set_index_urls(valid_url1)
-        assert manager.index_urls == [valid_url1]
+        assert manager.index_urls == (valid_url1,)
 
         manager.set_index_urls([valid_url1, valid_url2, valid_url3])
-        assert manager.index_urls == [valid_url1, valid_url2, valid_url3]
+        assert manager.index_urls == (valid_url1, valid_url2, valid_url3)
     finally:
         manager.set_index_urls(default_index_urls)
         assert manager.index_urls == default_index_urls
 
 
+@pytest.mark.asyncio
+async def test_set_index_urls_prefetch(monkeypatch):
+    import asyncio
+
+    fetch_kwargs_seen = []
+
+    async def prefetch_project_names(index_url, fetch_kwargs=None):
+        fetch_kwargs_seen.append(fetch_kwargs)
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(package_index, "prefetch_project_names", prefetch_project_names)
+
+    manager = get_test_package_manager()
+    manager.set_index_urls(
+        "https://pkg-index.com/simple/",
+        prefetch_project_list=True,
+        fetch_kwargs={"credentials": "include"},
+    )
+    tasks = manager._prefetch_tasks
+    await asyncio.sleep(0)
+    assert fetch_kwargs_seen == [{"credentials": "include"}]
+
+    manager.clear_index_cache()
+    await asyncio.sleep(0)
+    assert manager._prefetch_tasks == []
+    assert all(task.cancelled() for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_set_index_urls_does_not_prefetch_by_default(monkeypatch):
+    import asyncio
+
+    async def fetch_string_and_headers(url, kwargs):
+        raise AssertionError(f"unexpected request to {url}")
+
+    monkeypatch.setattr(
+        package_index, "fetch_string_and_headers", fetch_string_and_headers
+    )
+
+    manager = get_test_package_manager()
+    manager.set_index_urls(["https://mirror.example.com/simple/", "PYPI"])
+    await asyncio.sleep(0)
+
+    assert manager._prefetch_tasks == []
+
+
 def test_freeze():
     manager = get_test_package_manager()
 
@@ -62,6 +108,44 @@ def test_freeze():
     }
 
 
+def test_repodata_is_not_shared_between_managers():
+    from micropip._compat import REPODATA_PACKAGES
+
+    manager = get_test_package_manager()
+    other_manager = get_test_package_manager()
+
+    manager.repodata_packages["test-dep-1"] = {"version": "0.1.0"}
+
+    assert "test-dep-1" in manager.repodata_packages
+    assert "test-dep-1" not in other_manager.repodata_packages
+    assert "test-dep-1" not in REPODATA_PACKAGES
+
+
+@pytest.mark.asyncio
+async def test_install_from_repodata_overlay(monkeypatch):
+    import importlib
+
+    install = importlib.import_module("micropip.install")
+
+    loaded = []
+
+    async def loadPackage(names):
+        loaded.extend(names)
+
+    monkeypatch.setattr(install, "loadPackage", loadPackage)
+
+    manager = get_test_package_manager()
+    manager.repodata_packages["test-dep-1"] = {
+        "name": "test-dep-1",
+        "version": "0.1.0",
+        "depends": [],
+    }
+
+    await manager.install("test-dep-1")
+
+    assert loaded == ["test-dep-1"]
+
+
 @pytest.mark.asyncio
 async def test_list(mock_fetch: mock_fetch_cls):
     manager = get_test_package_manager()
@@ -78,6 +162,61 @@ async def test_list(mock_fetch: mock_fetch_cls):
     assert pkg_list[dummy].source.lower() == dummy_url
 
 
+@pytest.mark.asyncio
+async def test_list_reuses_installed_distributions(
+    mock_fetch: mock_fetch_cls, monkeypatch
+):
+    from micropip import package_manager
+
+    manager = get_test_package_manager()
+
+    calls = 0
+    list_installed_distributions = package_manager.list_installed_distributions
+
+    def counting_list_installed_distributions():
+        nonlocal calls
+        calls += 1
+        return list_installed_distributions()
+
+    monkeypatch.setattr(
+        package_manager,
+        "list_installed_distributions",
+        counting_list_installed_distributions,
+    )
+
+    mock_fetch.add_pkg_version("dummy")
+    mock_fetch.add_pkg_version("dummy2")
+
+    await manager.install("dummy")
+    assert "dummy" in manager.list()
+    assert "dummy" in manager.list()
+    assert calls == 1
+
+    await manager.install("dummy2")
+    assert "dummy2" in manager.list()
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_list_notices_out_of_band_installs(
+    mock_fetch: mock_fetch_cls, wheel_base, monkeypatch
+):
+    manager = get_test_package_manager()
+    monkeypatch.syspath_prepend(str(wheel_base))
+
+    mock_fetch.add_pkg_version("dummy")
+    await manager.install("dummy")
+    assert "other" not in manager.list()
+
+    # Installed without going through the PackageManager
+    dist_info = wheel_base / "other-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Name: other\nVersion: 1.0\n")
+    (dist_info / "PYODIDE_SOURCE").write_text("custom")
+
+    assert "other" in manager.list()
+
+
 @pytest.mark.asyncio
 async def test_custom_index_url(mock_package_index_json_api, monkeypatch):
     manager = get_test_package_manager()
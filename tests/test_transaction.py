@@ -144,6 +144,207 @@ async def test_add_requirement_query_url(mock_importlib, wheel_base, monkeypatch
     assert wheel.filename == SNOWBALL_WHEEL  # without the query params
 
 
+@pytest.mark.asyncio
+async def test_add_wheel_no_deps_waits_for_download(mock_fetch, monkeypatch):
+    import asyncio
+
+    from micropip import wheelinfo
+    from micropip.transaction import Transaction
+
+    mock_fetch.add_pkg_version("dummy", requirements=["dep"])
+
+    async def slow_fetch_bytes(url, kwargs):
+        await asyncio.sleep(0.01)
+        return await mock_fetch._fetch_bytes(url, kwargs)
+
+    monkeypatch.setattr(wheelinfo, "fetch_bytes", slow_fetch_bytes)
+
+    transaction = create_transaction(Transaction)
+    transaction.deps = False
+    await transaction.add_requirement("dummy")
+
+    assert [wheel.name for wheel in transaction.wheels] == ["dummy"]
+    assert transaction.wheels[0]._data is not None
+
+
+@pytest.mark.asyncio
+async def test_shared_dependency_queried_once(mock_fetch, monkeypatch):
+    import asyncio
+
+    from micropip import package_index
+    from micropip.transaction import Transaction
+
+    mock_fetch.add_pkg_version("a", requirements=["common"])
+    mock_fetch.add_pkg_version("b", requirements=["common"])
+    mock_fetch.add_pkg_version("common")
+
+    queried = []
+
+    async def counting_query_package(name, index_urls, kwargs):
+        queried.append(name)
+        await asyncio.sleep(0.01)
+        return await mock_fetch.query_package(name, index_urls, kwargs)
+
+    monkeypatch.setattr(package_index, "query_package", counting_query_package)
+
+    transaction = create_transaction(Transaction)
+    await transaction.gather_requirements(["a", "b"])
+
+    assert sorted(queried) == ["a", "b", "common"]
+    assert sorted(wheel.name for wheel in transaction.wheels) == ["a", "b", "common"]
+
+
+@pytest.mark.asyncio
+async def test_installed_version_looked_up_once(mock_fetch, monkeypatch):
+    import importlib.metadata
+
+    from micropip.transaction import Transaction
+
+    mock_fetch.add_pkg_version("a", requirements=["common"])
+    mock_fetch.add_pkg_version("b", requirements=["common"])
+    mock_fetch.add_pkg_version("common")
+
+    looked_up = []
+    version = importlib.metadata.version
+
+    def counting_version(name):
+        looked_up.append(name)
+        return version(name)
+
+    monkeypatch.setattr(importlib.metadata, "version", counting_version)
+
+    transaction = create_transaction(Transaction)
+    await transaction.gather_requirements(["a", "b"])
+
+    assert sorted(looked_up) == ["a", "b", "common"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "module, patched, limit",
+    [
+        ("micropip.wheelinfo", "fetch_bytes", "max_concurrent_downloads"),
+        ("micropip.package_index", "query_package", "max_concurrent_index_queries"),
+    ],
+)
+async def test_max_concurrency(module, patched, limit, mock_fetch, monkeypatch):
+    import asyncio
+    import dataclasses
+    import importlib
+
+    from micropip.transaction import Transaction
+
+    deps = [f"dep{i}" for i in range(5)]
+    mock_fetch.add_pkg_version("dummy", requirements=deps)
+    for dep in deps:
+        mock_fetch.add_pkg_version(dep)
+
+    mocked = {
+        "fetch_bytes": mock_fetch._fetch_bytes,
+        "query_package": mock_fetch.query_package,
+    }[patched]
+    running = 0
+    max_running = 0
+
+    async def slow_mocked(*args):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return await mocked(*args)
+
+    monkeypatch.setattr(importlib.import_module(module), patched, slow_mocked)
+
+    transaction = dataclasses.replace(create_transaction(Transaction), **{limit: 2})
+    await transaction.add_requirement("dummy")
+
+    assert len(transaction.wheels) == 6
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_install_layers(mock_fetch):
+    from micropip.transaction import Transaction
+
+    mock_fetch.add_pkg_version("a", requirements=["b", "c"])
+    mock_fetch.add_pkg_version("b", requirements=["c"])
+    mock_fetch.add_pkg_version("c")
+    mock_fetch.add_pkg_version("d")
+
+    transaction = create_transaction(Transaction)
+    await transaction.gather_requirements(["a", "d"])
+
+    layers = [
+        sorted(wheel.name for wheel in layer) for layer in transaction.install_layers()
+    ]
+    assert layers == [["c", "d"], ["b"], ["a"]]
+
+
+@pytest.mark.asyncio
+async def test_gather_requirements_cancels_on_failure():
+    import asyncio
+
+    from micropip.transaction import Transaction
+
+    transaction = create_transaction(Transaction)
+    cancelled = []
+
+    async def add_requirement(req):
+        if req == "bad":
+            raise ValueError("bad")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(req)
+            raise
+
+    transaction.add_requirement = add_requirement
+
+    with pytest.raises(ValueError, match="bad"):
+        await transaction.gather_requirements(["good", "bad"])
+    await asyncio.sleep(0)
+
+    assert cancelled == ["good"]
+
+
+@pytest.mark.asyncio
+async def test_add_wheel_cancels_download_on_failure(monkeypatch):
+    import asyncio
+
+    from micropip.transaction import Transaction
+    from micropip.wheelinfo import WheelInfo
+
+    transaction = create_transaction(Transaction)
+    wheel = WheelInfo.from_url("https://a/dummy-1.0.0-py3-none-any.whl")
+    cancelled = []
+
+    async def download_wheel(wheel):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(wheel.name)
+            raise
+
+    async def gather_requirements(requirements):
+        raise ValueError("bad")
+
+    async def download_pep658_metadata(self, fetch_kwargs):
+        # the wheel starts downloading meanwhile
+        await asyncio.sleep(0)
+
+    transaction._download_wheel = download_wheel
+    transaction.gather_requirements = gather_requirements
+    wheel.core_metadata = True
+    monkeypatch.setattr(WheelInfo, "download_pep658_metadata", download_pep658_metadata)
+    monkeypatch.setattr(WheelInfo, "requires", lambda self, extras: [])
+
+    with pytest.raises(ValueError, match="bad"):
+        await transaction.add_wheel(wheel, extras=set())
+
+    assert cancelled == ["dummy"]
+
+
 @pytest.mark.asyncio
 async def test_install_non_pure_python_wheel():
     pytest.importorskip("packaging")
@@ -224,6 +425,37 @@ def test_find_wheel_invalid_version():
     assert str(wheel.version) == "0.15.5"
 
 
+def test_find_wheel_invalid_filename():
+    """Check that a wheel filename that is only malformed outside of its
+    version field is skipped instead of producing an error
+    """
+    pytest.importorskip("packaging")
+    from packaging.requirements import Requirement
+
+    from micropip.package_index import ProjectInfo
+    from micropip.transaction import find_wheel
+
+    requirement = Requirement("foo")
+    filenames = ["foo-2.0-bad-py3-none-any.whl", "foo-1.0-py3-none-any.whl"]
+    metadata = ProjectInfo.from_simple_json_api(
+        {
+            "name": "foo",
+            "files": [
+                {
+                    "filename": filename,
+                    "url": f"https://example.com/{filename}",
+                    "hashes": {"sha256": "0" * 64},
+                }
+                for filename in filenames
+            ],
+        }
+    )
+
+    wheel = find_wheel(metadata, requirement)
+
+    assert str(wheel.version) == "1.0"
+
+
 _best_tag_test_cases = (
     "package, version, incompatible_tags, compatible_tags",
     # Tests assume that `compatible_tags` is sorted from least to most compatible:
@@ -260,6 +492,21 @@ def test_best_tag_from_pypi(package, version, incompatible_tags, compatible_tags
     assert best_tag in set(map(str, wheel.tags))
 
 
+def test_best_tag_not_listed_last():
+    pytest.importorskip("packaging")
+    from packaging.requirements import Requirement
+
+    from micropip.transaction import find_wheel
+
+    requirement = Requirement("compose")
+
+    metadata = _pypi_metadata("compose", {"1.4.8": ["py38", "py35", "py2.py30"]})
+
+    wheel = find_wheel(metadata, requirement)
+
+    assert "py38-none-any" in set(map(str, wheel.tags))
+
+
 # A newer version with a compatible wheel has higher precedence
 # than an older version with a more precisely compatible wheel.
 # This test verifies that we didn't break that corner case:
@@ -312,6 +559,18 @@ def test_search_pyodide_lock_first():
     )
     assert t.search_pyodide_lock_first is True
 
+    t = Transaction(
+        ctx={},
+        ctx_extras=[],
+        keep_going=True,
+        deps=True,
+        pre=True,
+        fetch_kwargs={},
+        verbose=False,
+        index_urls=list(package_index.DEFAULT_INDEX_URLS),
+    )
+    assert t.search_pyodide_lock_first is True
+
     t = Transaction(
         ctx={},
         ctx_extras=[],
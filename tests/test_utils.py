@@ -8,6 +8,94 @@ from pytest_pyodide import run_in_pyodide
 import micropip._utils as _utils
 
 
+def test_to_list():
+    packages = ["a", "b"]
+
+    assert _utils.to_list("a") == ["a"]
+    assert _utils.to_list(packages) is packages
+
+
+def test_json_without_orjson(monkeypatch):
+    import json
+
+    monkeypatch.setattr(_utils, "orjson", None)
+
+    data = {"info": {"arch": "wasm32"}, "packages": {"a": {"depends": []}}}
+    dumped = _utils.json_dumps(data)
+
+    assert json.loads(dumped) == data
+    assert " " not in dumped
+    assert _utils.json_loads(dumped) == data
+    assert _utils.json_loads(dumped.encode()) == data
+
+
+def test_json_with_orjson(monkeypatch):
+    import json
+    from types import SimpleNamespace
+
+    calls = []
+
+    def loads(data):
+        calls.append("loads")
+        return json.loads(data)
+
+    def dumps(data, option=None):
+        calls.append(("dumps", option))
+        return json.dumps(data).encode()
+
+    fake_orjson = SimpleNamespace(loads=loads, dumps=dumps, OPT_NON_STR_KEYS=1)
+    monkeypatch.setattr(_utils, "orjson", fake_orjson)
+
+    data = {"packages": {"a": {"depends": []}}}
+    dumped = _utils.json_dumps(data)
+
+    assert isinstance(dumped, str)
+    assert _utils.json_loads(dumped) == data
+    assert calls == [("dumps", 1), "loads"]
+
+
+def test_parse_wheel_filename_is_cached():
+    filename = "dummy-1.0.0-py3-none-any.whl"
+
+    assert _utils.parse_wheel_filename(filename) is _utils.parse_wheel_filename(
+        filename
+    )
+    # Every filename of every project page goes through it, so the cache must
+    # stay bounded.
+    assert _utils.parse_wheel_filename.cache_info().maxsize is not None
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        ("dummy-1.0.0-py3-none-any.whl", "1.0.0"),
+        ("dummy_pkg-2.0rc1-1-cp312-cp312-emscripten_3_1_58_wasm32.whl", "2.0rc1"),
+    ],
+)
+def test_parse_version(filename, expected):
+    from packaging.version import Version
+
+    assert _utils.parse_version(filename) == Version(expected)
+    assert _utils.parse_version(filename) == _utils.parse_wheel_filename(filename)[1]
+
+
+def test_parse_version_is_shared_across_files():
+    assert _utils.parse_version("dummy-1.0.0-py3-none-any.whl") is _utils.parse_version(
+        "dummy-1.0.0-cp312-cp312-emscripten_3_1_58_wasm32.whl"
+    )
+
+
+@pytest.mark.parametrize(
+    "filename", ["dummy-1.0.0.whl", "dummy-not.a.version-py3-none-any.whl"]
+)
+def test_parse_version_invalid(filename):
+    from packaging.utils import InvalidWheelFilename
+    from packaging.version import InvalidVersion
+
+    with pytest.raises((InvalidWheelFilename, InvalidVersion)):
+        _utils.parse_version(filename)
+
+
 def test_get_root():
     dist = distribution("pytest")
     root = _utils.get_root(dist)
@@ -93,6 +181,12 @@ def raiseValueError(msg):
             PLATFORM,
             raiseValueError("Wheel interpreter version 'cp391' is not supported."),
         ),
+        (
+            "cp391",
+            "cp391.abi3",
+            PLATFORM,
+            raiseValueError("Wheel interpreter version 'cp391' is not supported."),
+        ),
     ],
 )
 def test_check_compatible(mock_platform, interp, abi, arch, ctx):
@@ -1,3 +1,5 @@
+import hashlib
+
 import pytest
 
 from micropip.wheelinfo import WheelInfo
@@ -78,6 +80,24 @@ async def test_download(wheel_catalog):
     assert wheel._metadata is not None
 
 
+@pytest.mark.asyncio
+async def test_download_hashes_once(wheel_catalog, tmp_path, monkeypatch):
+    pytest_wheel = wheel_catalog.get("pytest")
+    wheel = WheelInfo.from_url(pytest_wheel.url)
+    wheel.sha256 = "dummy-sha256"
+
+    await wheel.download({})
+    assert wheel._data_sha256 == hashlib.sha256(pytest_wheel.content).hexdigest()
+
+    # the checksum computed during download is reused, not recomputed
+    monkeypatch.setattr(
+        "micropip.wheelinfo._generate_package_hash",
+        lambda data: pytest.fail("wheel hashed twice"),
+    )
+    with pytest.raises(RuntimeError, match="Invalid checksum: expected dummy-sha256"):
+        await wheel.install(tmp_path)
+
+
 @pytest.mark.asyncio
 async def test_requires(wheel_catalog, tmp_path):
     pytest_wheel = wheel_catalog.get("pytest")